@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: analytics.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Post-run analytics of the satellites trajectory. Builds a compact index of the apsides, orbit
+                  elements of each revolution, burns, closest approaches and sphere of influence crossings in one
+                  vectorised pass, so reports do not have to scan the full state vectors again
+"""
+
+from global_params import dt
+from celestial_body import Earth, Moon
+import numpy as np
+
+def crossings(g, direction=0):
+    """
+        crossings - Indices k where g changes sign between k and k+1, along with the fraction of the step at which
+                    it crosses zero. A direction of -1 only finds positive to negative, +1 negative to positive
+    """
+    g_0, g_1 = g[:-1], g[1:]
+    falling = (g_0 > 0) & (g_1 <= 0)
+    rising = (g_0 < 0) & (g_1 >= 0)
+    if direction < 0:
+        mask = falling
+    elif direction > 0:
+        mask = rising
+    else:
+        mask = falling | rising
+
+    k = np.flatnonzero(mask)
+    fraction = g_0[k] / (g_0[k] - g_1[k])
+    return k, fraction
+
+class TrajectoryIndex:
+    def __init__(self):
+        """
+            TrajectoryIndex - Features of a single run. Every entry is a list of rows in time order
+        """
+        self.apsides = []               # Periapsis and apoapsis around the earth and the moon
+        self.revolutions = []           # Orbit elements around the earth at each periapsis
+        self.burns = []                 # Start, end and delta-v of each burn
+        self.closest_approaches = []    # Minimum altitude above the earth and the moon
+        self.soi_crossings = []         # Entries to and exits from the moons sphere of influence
+
+    def first(self, feature, kind=None):
+        """
+            first - Returns the first row of a feature, optionally only of the given kind, or None
+        """
+        for row in getattr(self, feature):
+            if kind is None or row["kind"] == kind:
+                return row
+        return None
+
+    def total_delta_v(self):
+        """
+            total_delta_v - Sum of the delta-v of every burn
+        """
+        return sum(burn["delta_v"] for burn in self.burns)
+
+    def report(self):
+        """
+            report - Human readable summary of the index
+        """
+        lines = ["Burns: %d, total delta-v %.2f m/s" % (len(self.burns), self.total_delta_v())]
+        for burn in self.burns:
+            lines.append("  T+%.0f s to T+%.0f s  %.2f m/s" % (burn["start_time"], burn["end_time"], burn["delta_v"]))
+
+        lines.append("Revolutions around the earth: %d" % len(self.revolutions))
+        for rev in self.revolutions:
+            lines.append("  %d  T+%.0f s  a %.0f m  e %.4f  periapsis alt %.0f m  apoapsis alt %.0f m" % \
+                         (rev["revolution"], rev["time"], rev["a"], rev["e"], rev["alt_periapsis"], rev["alt_apoapsis"]))
+
+        for approach in self.closest_approaches:
+            lines.append("Closest approach to the %s: %.0f m at T+%.0f s" % (approach["kind"], approach["altitude"], approach["time"]))
+
+        for crossing in self.soi_crossings:
+            lines.append("Moon SOI %s at T+%.0f s" % (crossing["kind"], crossing["time"]))
+
+        return "\n".join(lines)
+
+def build_index(satellite, t, last):
+    """
+        build_index - Builds the trajectory index of a satellite from its state vectors, up to and including step last.
+                      Also takes the ring_buffer.RingHistory of an open-ended run, whose entries are not evenly spaced
+                      and whose burns were logged during the run
+    """
+    n = last + 1
+    time = np.array(t[:n], dtype=float)
+    # Simulation step of each entry, which is not its index in the decimated history of a ring buffer run
+    steps = np.asarray(getattr(satellite, "steps", range(n)))[:n]
+    # Time each entry stands for, up to the next entry
+    widths = np.diff(time, append=time[-1] + dt)
+    x = np.array(satellite.x[:n], dtype=float)
+    y = np.array(satellite.y[:n], dtype=float)
+    v_x = np.array(satellite.v_x[:n], dtype=float)
+    v_y = np.array(satellite.v_y[:n], dtype=float)
+    r = np.array(satellite.r[:n], dtype=float)
+    m_x = np.array(satellite.m_x[:n], dtype=float)
+    m_y = np.array(satellite.m_y[:n], dtype=float)
+    m_r = np.array(satellite.m_r[:n], dtype=float)
+    f_r = np.array(satellite.f_r[:n], dtype=float)
+
+    index = TrajectoryIndex()
+
+    def interpolate(values, k, fraction):
+        return values[k] + fraction * (values[k+1] - values[k])
+
+    # Apsides around the earth, where the radial velocity changes sign
+    radial = x * v_x + y * v_y
+    for kind, direction in (("periapsis", 1), ("apoapsis", -1)):
+        k, fraction = crossings(radial, direction)
+        for step, radius, when in zip(k, interpolate(r, k, fraction), interpolate(time, k, fraction)):
+            index.apsides.append({"body": "earth", "kind": kind, "step": int(steps[step]), "time": float(when),
+                                  "altitude": float(radius - Earth.radius)})
+
+    # Apsides around the moon, using the moons velocity from its circular orbit
+    moon_speed = 2 * np.pi / Moon.period
+    moon_v_x = moon_speed * (m_y - y)
+    moon_v_y = moon_speed * (x - m_x)
+    moon_radial = m_x * (v_x - moon_v_x) + m_y * (v_y - moon_v_y)
+    for kind, direction in (("periapsis", 1), ("apoapsis", -1)):
+        k, fraction = crossings(moon_radial, direction)
+        for step, radius, when in zip(k, interpolate(m_r, k, fraction), interpolate(time, k, fraction)):
+            index.apsides.append({"body": "moon", "kind": kind, "step": int(steps[step]), "time": float(when),
+                                  "altitude": float(radius - Moon.radius)})
+    index.apsides.sort(key=lambda row: row["time"])
+
+    # Osculating orbit elements around the earth at each periapsis
+    v_squared = v_x**2 + v_y**2
+    energy = v_squared / 2 - Earth.mu / r
+    e_x = ((v_squared - Earth.mu / r) * x - radial * v_x) / Earth.mu
+    e_y = ((v_squared - Earth.mu / r) * y - radial * v_y) / Earth.mu
+    periapsides = [row for row in index.apsides if row["body"] == "earth" and row["kind"] == "periapsis"]
+    for revolution, row in enumerate(periapsides):
+        k = int(np.searchsorted(steps, row["step"]))
+        a = -Earth.mu / (2 * energy[k])
+        e = float(np.hypot(e_x[k], e_y[k]))
+        index.revolutions.append({"revolution": revolution + 1, "step": int(steps[k]), "time": row["time"],
+                                  "a": float(a), "e": e,
+                                  "alt_periapsis": float(a * (1 - e) - Earth.radius),
+                                  "alt_apoapsis": float(a * (1 + e) - Earth.radius) if e < 1 else float("inf"),
+                                  "period": float(2 * np.pi * np.sqrt(a**3 / Earth.mu)) if a > 0 else float("inf")})
+
+    # The burns of an open-ended run were logged as they happened, as its decimated thrust can not be integrated.
+    # Otherwise burns are the runs of steps with a non-zero thrust. A run that stops on a burn, such as the capture
+    # burn, ends one entry past the last one stored
+    if getattr(satellite, "burns", None) is not None:
+        index.burns = list(satellite.burns)
+    else:
+        thrusting = np.concatenate(([0], (f_r != 0).astype(np.int8), [0]))
+        starts = np.flatnonzero(np.diff(thrusting) == 1)
+        ends = np.flatnonzero(np.diff(thrusting) == -1)
+        end_steps = np.append(steps, steps[-1] + 1)
+        end_times = np.append(time, time[-1] + widths[-1])
+        for start, end in zip(starts, ends):
+            index.burns.append({"start_step": int(steps[start]), "end_step": int(end_steps[end]),
+                                "start_time": float(time[start]), "end_time": float(end_times[end]),
+                                "duration": float(end_times[end] - time[start]),
+                                "delta_v": float(np.sum(f_r[start:end] * widths[start:end]) / satellite.mass)})
+
+    # Lowest altitudes over the whole run
+    for kind, altitude in (("earth", r - Earth.radius), ("moon", m_r - Moon.radius)):
+        k = int(np.argmin(altitude))
+        index.closest_approaches.append({"kind": kind, "step": int(steps[k]), "time": float(time[k]), "altitude": float(altitude[k])})
+
+    # Crossings of the moons sphere of influence
+    for kind, direction in (("entry", -1), ("exit", 1)):
+        k, fraction = crossings(m_r - Moon.soi, direction)
+        for step, when in zip(k, interpolate(time, k, fraction)):
+            index.soi_crossings.append({"kind": kind, "step": int(steps[step]), "time": float(when)})
+    index.soi_crossings.sort(key=lambda row: row["time"])
+
+    return index
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: batch.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Headless command line interface that runs one or more scenario files and writes their outputs to a
+                  directory. Never imports matplotlib, so it starts quickly and runs without a display
+"""
+
+import multiprocessing
+import argparse
+import json
+import math
+import os
+
+# Outputs written for a scenario that does not list its own
+DEFAULT_OUTPUTS = ("csv", "summary", "trajectory")
+
+def load_scenario(filename):
+    """
+        load_scenario - Reads a scenario file. The name of the scenario defaults to the name of the file
+    """
+    with open(filename) as scenario_file:
+        scenario = json.load(scenario_file)
+    scenario.setdefault("name", os.path.splitext(os.path.basename(filename))[0])
+    return scenario
+
+def run_scenario(scenario, output_dir):
+    """
+        run_scenario - Runs a single scenario and writes its outputs. The simulation modules are configured and imported
+                       here, so this must run in a fresh process for every scenario
+    """
+    if "vehicles" in scenario and "ring_buffer" in scenario:
+        raise ValueError("Scenario %s: ring buffers are only supported for the Photon satellite on its own" % scenario["name"])
+
+    configure_scenario(scenario)
+    os.makedirs(output_dir, exist_ok=True)
+
+    if "vehicles" in scenario:
+        return run_fleet(scenario, output_dir)
+    else:
+        return run_photon(scenario, output_dir)
+
+def configure_scenario(scenario):
+    """
+        configure_scenario - Applies the simulation settings of a scenario before the simulation modules are imported,
+                             then places the moon
+    """
+    import global_params
+    global_params.configure(scenario.get("steps"), scenario.get("step_size"), scenario.get("keyframe_spacing"),
+                            scenario.get("ring_buffer"))
+    global_params.PHOTON_PARAMETERS.update(scenario.get("photon_parameters", {}))
+
+    from celestial_body import Moon
+
+    if scenario.get("moon_angle") is not None:
+        Moon.set_moon_angle(scenario["moon_angle"] * (math.pi / 180))
+
+def create_force_models(scenario):
+    """
+        create_force_models - Creates the force models listed in a scenario, shared by every satellite it flies
+    """
+    from force_models import create_force_model
+
+    return [create_force_model(settings) for settings in scenario.get("force_models", [])]
+
+def fly_photon(scenario):
+    """
+        fly_photon - Flies the Photon satellite on its own through the main simulation loop. Returns the event detector
+                     of the run and the index of the last step. A scenario with ring_buffer settings runs open-ended in
+                     constant memory, until the satellite deorbits, stops on capture or reaches max_steps
+    """
+    from satellite import Photon, reset_photon
+    from propagate import propagate_photon, propagate_until
+    from ring_buffer import enable_ring_buffers
+    from events import EventDetector
+
+    reset_photon(**scenario.get("satellite_settings", {}))
+    Photon.force_models = create_force_models(scenario)
+    if "ring_buffer" in scenario:
+        enable_ring_buffers()
+
+    detector = EventDetector(Photon)
+    detector.add_default_events()
+    if scenario.get("stop_on_capture", False):
+        detector.add_stop_condition(lambda satellite, i: satellite.thrust_moon_in_circle_called > 0)
+
+    if "ring_buffer" in scenario:
+        return detector, propagate_until(detector.check, scenario.get("max_steps"))
+    return detector, propagate_photon(detector.check)
+
+def run_photon(scenario, output_dir):
+    """
+        run_photon - Flies the Photon satellite and writes its outputs
+    """
+    from satellite import Photon
+    from propagate import dump_to_file
+    from ring_buffer import RingHistory
+    from global_params import t
+
+    detector, i = fly_photon(scenario)
+
+    name = scenario["name"]
+    outputs = scenario.get("outputs", DEFAULT_OUTPUTS)
+    if "csv" in outputs:
+        dump_to_file(os.path.join(output_dir, name + ".csv"))
+
+    # Only the decimated history is left of an open-ended run
+    history = RingHistory(Photon, t) if "ring_buffer" in scenario else None
+    summary = write_vehicle_outputs(name, Photon, detector, i, outputs, output_dir, history, Photon.force_models)
+    return {key: summary[key] for key in ("name", "steps", "end_time", "has_deorbited", "captured")}
+
+def fly_fleet(scenario):
+    """
+        fly_fleet - Flies every vehicle of the scenario in one shared time loop. Each vehicle can set its mass, starting
+                    altitude above the earth, maneuver sequence by name and any of the arguments of satellite_settings.
+                    Returns the event detector of each vehicle, which holds its satellite, and the index of the last step
+    """
+    from satellite import create_satellite
+    from fleet import Fleet, MANEUVER_SEQUENCES
+    from events import EventDetector
+    from global_params import t
+
+    fleet = Fleet()
+    detectors = []
+    force_models = create_force_models(scenario)
+    for vehicle in scenario["vehicles"]:
+        satellite = create_satellite(vehicle.get("mass", 100),
+                                     vehicle.get("earth_altitude", 1e6),
+                                     **vehicle.get("satellite_settings", {}))
+        satellite.force_models = list(force_models)
+        fleet.add(satellite, MANEUVER_SEQUENCES[vehicle.get("maneuvers", "transfer")])
+        detector = EventDetector(satellite)
+        detector.add_default_events()
+        detectors.append(detector)
+
+    def stop_condition(i):
+        # Satellites that deorbited on an earlier step have no state for this one
+        for detector in detectors:
+            if not detector.satellite.has_deorbited or detector.satellite.deorbit_time == t[i+1]:
+                detector.check(i)
+        return scenario.get("stop_on_capture", False) and \
+               all(satellite.thrust_moon_in_circle_called > 0 for satellite in fleet.satellites)
+
+    return detectors, fleet.propagate(stop_condition)
+
+def vehicle_last_step(satellite, i):
+    """
+        vehicle_last_step - Index of the last step of a fleet vehicle when the fleet stopped at step i. A satellite that
+                            deorbited stops at its deorbit step
+    """
+    from global_params import dt
+
+    return int(round(satellite.deorbit_time / dt)) - 1 if satellite.has_deorbited else i
+
+def vehicle_names(scenario):
+    """
+        vehicle_names - Names of the vehicles of a fleet scenario, prefixed with the scenario name
+    """
+    return [scenario["name"] + "_" + vehicle.get("name", str(number)) for number, vehicle in enumerate(scenario["vehicles"])]
+
+def run_fleet(scenario, output_dir):
+    """
+        run_fleet - Flies the vehicles of a scenario together and writes the outputs of each
+    """
+    from propagate import dump_satellite_to_file
+    from global_params import t
+
+    detectors, i = fly_fleet(scenario)
+
+    outputs = scenario.get("outputs", DEFAULT_OUTPUTS)
+    names = vehicle_names(scenario)
+    summaries = []
+    for name, detector in zip(names, detectors):
+        if "csv" in outputs:
+            dump_satellite_to_file(os.path.join(output_dir, name + ".csv"), detector.satellite)
+        last = vehicle_last_step(detector.satellite, i)
+        summaries.append(write_vehicle_outputs(name, detector.satellite, detector, last, outputs, output_dir))
+
+    result = {"name": scenario["name"],
+              "steps": i + 1,
+              "end_time": t[i+1],
+              "has_deorbited": any(summary["has_deorbited"] for summary in summaries),
+              "captured": all(summary["captured"] for summary in summaries)}
+
+    # The force models are shared by the vehicles, so their cost is only known for the fleet as a whole
+    if "summary" in outputs:
+        force_models = []
+        for detector in detectors:
+            force_models += [model for model in detector.satellite.force_models if model not in force_models]
+        summary = dict(result, vehicles=names, force_models=[model.timing() for model in force_models])
+        with open(os.path.join(output_dir, scenario["name"] + "_summary.json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+
+    return result
+
+def write_vehicle_outputs(name, satellite, detector, i, outputs, output_dir, history=None, force_models=None):
+    """
+        write_vehicle_outputs - Writes the trajectory nodes and the summary of a satellite whose last step was i+1.
+                                The trajectory and index of an open-ended run are built from its ring_buffer.RingHistory.
+                                The cost of the force models is only added when they belong to this satellite alone.
+                                Returns the summary
+    """
+    from global_params import t
+    from analytics import build_index
+    from trajectory import Trajectory
+
+    # The history is already decimated, so every entry is kept as a node
+    if history is None:
+        states, times, last, stride = satellite, t, i + 1, 100
+    else:
+        states, times, last, stride = history, history.t, history.last, 1
+
+    if "trajectory" in outputs:
+        Trajectory.from_satellite(states, times, last, stride).save(os.path.join(output_dir, name + "_trajectory.npz"))
+
+    summary = {"name": name,
+               "steps": i + 1,
+               "end_time": t[i+1],
+               "has_deorbited": satellite.has_deorbited,
+               "deorbit_time": satellite.deorbit_time,
+               "captured": satellite.thrust_moon_in_circle_called > 0}
+    if "summary" in outputs:
+        index = build_index(states, times, last)
+        summary["events"] = detector.table
+        summary["burns"] = index.burns
+        summary["revolutions"] = index.revolutions
+        summary["closest_approaches"] = index.closest_approaches
+        summary["soi_crossings"] = index.soi_crossings
+        if force_models is not None:
+            summary["force_models"] = [model.timing() for model in force_models]
+        with open(os.path.join(output_dir, name + "_summary.json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+
+    return summary
+
+def run_batch(filenames, output_dir, processes=None):
+    """
+        run_batch - Runs every scenario file, each in a fresh worker process so that their settings can not leak into
+                    one another. Returns the short summary of each scenario in the order given
+    """
+    scenarios = [load_scenario(filename) for filename in filenames]
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, maxtasksperchild=1) as pool:
+        return pool.starmap(run_scenario, [(scenario, output_dir) for scenario in scenarios])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run lunar satellite scenarios headless and write their outputs")
+    parser.add_argument("scenarios", nargs="+", help="Scenario files to run")
+    parser.add_argument("-o", "--output-dir", default="output", help="Directory the outputs are written to")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="Number of scenarios to run at once")
+    args = parser.parse_args()
+
+    for result in run_batch(args.scenarios, args.output_dir, args.processes):
+        print("%s: %d steps, ended at T+%s s, deorbited: %s, captured: %s" % \
+              (result["name"], result["steps"], result["end_time"], result["has_deorbited"], result["captured"]))
@@ -25,7 +25,8 @@ class CelestialBody(Mass):
         self.radius = radius     # Radius of body
         self.period = period * 24 * 60 * 60 # Total days to rotate once around its parent body
         self.dE = dE             # Distance between bodies
-        self.soi = (self.mass / Earth.mass) ** 0.4 * self.radius # Sphere of influence
+        self.soi = (self.mass / Earth.mass) ** 0.4 * self.dE # Sphere of influence
+        self.has_ephemeris = False # Has a precomputed ephemeris been installed?
         
     def calc_position(self, i):
         """
@@ -35,6 +36,15 @@ class CelestialBody(Mass):
         self.y[i+1] = self.dE * math.sin(2 * math.pi / self.period * t[i+1] + self.omega[0])
         self.r[i+1] = math.sqrt(self.x[i+1]**2 + self.y[i+1]**2)
         
+    def position_at(self, time):
+        """
+            position_at - Position and velocity of the body at any time, not just on a time step
+        """
+        angle = 2 * math.pi / self.period * time + self.omega[0]
+        speed = 2 * math.pi / self.period * self.dE
+        return (self.dE * math.cos(angle), self.dE * math.sin(angle),
+                -speed * math.sin(angle), speed * math.cos(angle))
+        
     def init_moon_angle(self):
         """ 
         init_moon_angle - Calculates the inital angle of the moon conditionally based on the y position.
@@ -51,6 +61,15 @@ class CelestialBody(Mass):
         else:
             print("ERROR: Could not calculate initial angle of the moon based on the values given!")
     
+    def set_moon_angle(self, angle):
+        """
+            set_moon_angle - Places the moon at the given angle (radians) around its parent body at the start of the simulation
+        """
+        self.x[0] = self.dE * math.cos(angle)
+        self.y[0] = self.dE * math.sin(angle)
+        self.r[0] = math.sqrt(self.x[0]**2 + self.y[0]**2)
+        self.init_moon_angle()
+
     def calc_moon_angle(self, i):
         """ Calculates the new angle of the moon conditionally based on the most current y position """
         if self.y[i+1] >= 0:
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: ephemeris.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Precomputes the Moon's ephemeris for the whole simulation and publishes it through
+                  shared memory so that several worker processes can read a single copy of it
+"""
+
+from celestial_body import Moon
+from global_params import z, dt
+from multiprocessing import shared_memory
+import numpy as np
+import math
+
+# Order of the rows in the shared ephemeris block
+EPHEMERIS_FIELDS = ("x", "y", "r", "omega")
+
+# Shared memory blocks attached by this process, kept alive for as long as the views are in use
+_attached = []
+
+def compute_moon_ephemeris():
+    """
+        compute_moon_ephemeris - Calculates the x, y, r and omega values of the moon for every time step in one go.
+                                 Gives the same values as running Moon.calc_position and Moon.calc_moon_angle
+                                 at every step of the main simulation loop
+    """
+    # Accumulate the time steps the same way the main loop does, so they agree for any dt
+    time = np.concatenate(([0.0], np.cumsum(np.full(z - 1, float(dt)))))
+    angle = 2 * math.pi / Moon.period * time + Moon.omega[0]
+
+    table = np.empty((len(EPHEMERIS_FIELDS), z))
+    x, y, r, omega = table
+    x[:] = Moon.dE * np.cos(angle)
+    y[:] = Moon.dE * np.sin(angle)
+
+    # Keep the initial conditions the moon was created with
+    x[0] = Moon.x[0]
+    y[0] = Moon.y[0]
+    r[:] = np.sqrt(x**2 + y**2)
+
+    # Swap the angle depending on the y position, same as calc_moon_angle
+    omega[:] = np.arccos(np.clip(x / r, -1.0, 1.0))
+    omega[:] = np.where(y >= 0, omega, (2 * math.pi) - omega)
+    omega[0] = Moon.omega[0]
+
+    return table
+
+def install_moon_ephemeris(table):
+    """
+        install_moon_ephemeris - Replaces the moons state vectors with the rows of a precomputed ephemeris table.
+                                 The main loop will no longer calculate the position of the moon once installed
+    """
+    for row, field in enumerate(EPHEMERIS_FIELDS):
+        setattr(Moon, field, table[row])
+    Moon.has_ephemeris = True
+
+class SharedEphemeris:
+    """
+        SharedEphemeris - Owner of the shared memory block holding the moon's ephemeris. Only the process
+                          that published the ephemeris should close and unlink it
+    """
+    def __init__(self, table):
+        self.shm = shared_memory.SharedMemory(create=True, size=table.nbytes)
+        self.table = np.ndarray(table.shape, dtype=table.dtype, buffer=self.shm.buf)
+        self.table[:] = table
+        self.name = self.shm.name
+        self.shape = table.shape
+
+    def close(self):
+        """
+            close - Releases the shared memory block once all of the workers have finished with it
+        """
+        self.table = None
+        self.shm.close()
+        self.shm.unlink()
+
+def publish_moon_ephemeris():
+    """
+        publish_moon_ephemeris - Computes the moons ephemeris once and copies it into shared memory.
+                                 Pass the name and shape of the returned block to attach_moon_ephemeris in each
+                                 worker
+    """
+    return SharedEphemeris(compute_moon_ephemeris())
+
+def attach_moon_ephemeris(name, shape):
+    """
+        attach_moon_ephemeris - Attaches to a published ephemeris and installs zero-copy, read-only views of it
+                                onto the moon. The shape comes from the publisher, since a worker that was never
+                                configured the same way has its own z. Intended to be used as the initializer of a
+                                multiprocessing pool
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    _attached.append(shm)
+
+    table = np.ndarray(tuple(shape), dtype=np.float64, buffer=shm.buf)
+    table.flags.writeable = False
+    install_moon_ephemeris(table)
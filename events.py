@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: events.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Detects events such as impacts, sphere of influence crossings and apsides during the simulation.
+                  Sign changes of the event functions are located to within a fraction of a time step and
+                  recorded in an event table
+"""
+
+from global_params import t
+from celestial_body import Earth, Moon
+from trajectory import hermite_state
+import math
+
+# Events are located to within this many seconds
+EVENT_TIME_TOLERANCE = 1e-6
+
+def alt_earth(time, x, y, v_x, v_y, moon):
+    """
+        alt_earth - Altitude above the surface of the earth
+    """
+    return (x**2 + y**2) ** 0.5 - Earth.radius
+
+def alt_moon(time, x, y, v_x, v_y, moon):
+    """
+        alt_moon - Altitude above the surface of the moon
+    """
+    moon_x, moon_y, _, _ = moon
+    return ((x - moon_x)**2 + (y - moon_y)**2) ** 0.5 - Moon.radius
+
+def moon_soi(time, x, y, v_x, v_y, moon):
+    """
+        moon_soi - Distance outside of the moons sphere of influence, negative when inside it
+    """
+    moon_x, moon_y, _, _ = moon
+    return ((x - moon_x)**2 + (y - moon_y)**2) ** 0.5 - Moon.soi
+
+def radial_velocity_earth(time, x, y, v_x, v_y, moon):
+    """
+        radial_velocity_earth - Velocity along the position vector from the earth, zero at periapsis and apoapsis
+    """
+    return x * v_x + y * v_y
+
+def radial_velocity_moon(time, x, y, v_x, v_y, moon):
+    """
+        radial_velocity_moon - Velocity along the position vector from the moon, zero at the closest approach
+    """
+    moon_x, moon_y, moon_v_x, moon_v_y = moon
+    return (x - moon_x) * (v_x - moon_v_x) + (y - moon_y) * (v_y - moon_v_y)
+
+def moon_state(i):
+    """
+        moon_state - Position and velocity of the moon at step i, from the position the main loop already calculated.
+                     The moon moves in a circle around the earth, so its velocity is its position turned a right angle
+    """
+    rate = 2 * math.pi / Moon.period
+    return (Moon.x[i], Moon.y[i], -rate * Moon.y[i], rate * Moon.x[i])
+
+class Event:
+    def __init__(self, name, function, direction=0, terminal=False):
+        """
+            Event - An event happens when function(time, x, y, v_x, v_y, moon) changes sign, where moon is the
+                    x, y position and x, y velocity of the moon at that time. A direction of -1 only detects a change
+                    from positive to negative, +1 only negative to positive, and 0 either. Terminal events end the
+                    simulation
+        """
+        self.name = name
+        self.function = function
+        self.direction = direction
+        self.terminal = terminal
+        self.index = None           # Position of the function in the functions of its detector
+
+    def crossed(self, g_0, g_1):
+        """
+            crossed - Determines whether the event function has crossed zero in the right direction over a step
+        """
+        if self.direction <= 0 and g_0 > 0 >= g_1:
+            return True
+        elif self.direction >= 0 and g_0 < 0 <= g_1:
+            return True
+        else:
+            return False
+
+class EventDetector:
+    def __init__(self, satellite):
+        """
+            EventDetector - Checks the events registered against a satellite on every step of the simulation, and
+                            collects the exact time and state of each of them in an event table
+        """
+        self.satellite = satellite
+        self.events = []
+        self.functions = []         # Event functions, each evaluated once a step however many events use it
+        self.stop_conditions = []
+        self.table = []             # Rows of name, step, time, x, y, v_x, v_y
+        self.previous = None        # Value of each event function at the start of the step
+        self.has_stopped = False
+
+    def add_event(self, name, function, direction=0, terminal=False):
+        """
+            add_event - Registers an event function with the detector
+        """
+        if function not in self.functions:
+            self.functions.append(function)
+            self.previous = None
+        event = Event(name, function, direction, terminal)
+        event.index = self.functions.index(function)
+        self.events.append(event)
+
+    def add_stop_condition(self, condition):
+        """
+            add_stop_condition - Registers a condition(satellite, i) that ends the simulation when it returns True
+        """
+        self.stop_conditions.append(condition)
+
+    def add_default_events(self):
+        """
+            add_default_events - Registers impacts on the earth and moon (terminal), crossings of the moons
+                                 sphere of influence, periapsis and apoapsis around the earth and the closest
+                                 approaches to the moon
+        """
+        self.add_event("impact_earth", alt_earth, -1, True)
+        self.add_event("impact_moon", alt_moon, -1, True)
+        self.add_event("soi_entry", moon_soi, -1)
+        self.add_event("soi_exit", moon_soi, 1)
+        self.add_event("periapsis", radial_velocity_earth, 1)
+        self.add_event("apoapsis", radial_velocity_earth, -1)
+        self.add_event("moon_periapsis", radial_velocity_moon, 1)
+
+    def state(self, i):
+        """
+            state - Position and velocity of the satellite at step i
+        """
+        sat = self.satellite
+        return (sat.x[i], sat.y[i], sat.v_x[i], sat.v_y[i])
+
+    def locate(self, event, i, state_0, state_1):
+        """
+            locate - Bisects the step from i to i+1 for the time of the event, on the cubic Hermite interpolant
+                     of the satellites state. Returns the time and state of the event
+        """
+        h = t[i+1] - t[i]
+        lower, upper = 0.0, h
+        g_lower = event.function(t[i], *state_0, moon_state(i))
+
+        # Between steps the moon has no stored position
+        while upper - lower > EVENT_TIME_TOLERANCE:
+            middle = 0.5 * (lower + upper)
+            state = hermite_state(middle, state_0, state_1, h)
+            g_middle = event.function(t[i] + middle, *state, Moon.position_at(t[i] + middle))
+            if event.crossed(g_lower, g_middle):
+                upper = middle
+            else:
+                lower, g_lower = middle, g_middle
+
+        return t[i] + upper, hermite_state(upper, state_0, state_1, h)
+
+    def check(self, i):
+        """
+            check - Looks for events over the step from i to i+1 and evaluates the stop conditions. Returns True
+                    when the simulation should end. Can be passed straight to propagate_photon as its stop condition
+        """
+        state_0 = self.state(i)
+        state_1 = self.state(i+1)
+        found = []
+
+        previous = self.previous
+        if previous is None:
+            moon_0 = moon_state(i)
+            previous = [function(t[i], *state_0, moon_0) for function in self.functions]
+        moon_1 = moon_state(i+1)
+        current = [function(t[i+1], *state_1, moon_1) for function in self.functions]
+
+        for event in self.events:
+            g_0 = previous[event.index]
+            g_1 = current[event.index]
+
+            # Most steps cross nothing, so skip any function that kept its sign
+            if (g_0 > 0 and g_1 > 0) or (g_0 < 0 and g_1 < 0):
+                continue
+            if event.crossed(g_0, g_1):
+                time, state = self.locate(event, i, state_0, state_1)
+                found.append((time, event, state))
+
+        self.previous = current
+
+        # Several events can happen over the same step, record them in the order they happened
+        for time, event, state in sorted(found, key=lambda item: item[0]):
+            self.table.append({"name": event.name, "step": i, "time": time,
+                               "x": state[0], "y": state[1], "v_x": state[2], "v_y": state[3]})
+            if event.terminal:
+                self.has_stopped = True
+
+        for condition in self.stop_conditions:
+            if condition(self.satellite, i):
+                self.has_stopped = True
+
+        return self.has_stopped
+
+    def reset(self):
+        """
+            reset - Clears the event table so the detector can be used for another run
+        """
+        self.table = []
+        self.previous = None
+        self.has_stopped = False
+
+    def first(self, name):
+        """
+            first - Returns the first row of the event table with the given name, or None if it never happened
+        """
+        for row in self.table:
+            if row["name"] == name:
+                return row
+        return None
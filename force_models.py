@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: force_models.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Pluggable perturbation forces on top of the point mass gravity of the earth and the moon. Each force
+                  model can be enabled only in some phases of the mission or within some distance of the earth, and
+                  keeps a count of its calls and the time spent in them
+"""
+
+from global_params import t
+from celestial_body import Earth
+from abc import ABC, abstractmethod
+from time import perf_counter
+import numpy as np
+import math
+
+# Gravitational parameter of the sun (m^3/s^2)
+SUN_MU = 1.32712440018e20
+
+# Mean distance between the earth and the sun (m)
+SUN_DISTANCE = 1.495978707e11
+
+# Length of a year, the period of the suns apparent orbit around the earth (s)
+SUN_PERIOD = 365.25 * 24 * 60 * 60
+
+# Second zonal harmonic of the earths gravity field
+EARTH_J2 = 1.08263e-3
+
+def mission_phase(satellite):
+    """
+        mission_phase - Name of the phase of the mission the satellite is in, from the maneuvers it has performed
+    """
+    if satellite.thrust_moon_in_circle_called > 0:
+        return "lunar_orbit"
+    elif satellite.thrust_earth_in_ellipse_called >= 2:
+        return "trans_lunar"
+    elif satellite.thrust_earth_in_circle_called >= 2:
+        return "parking_orbit_2"
+    elif satellite.thrust_earth_in_ellipse_called == 1:
+        return "transfer_orbit"
+    elif satellite.thrust_earth_in_circle_called == 1:
+        return "parking_orbit"
+    else:
+        return "ascent"
+
+class Condition:
+    def __init__(self, check, mask):
+        """
+            Condition - A condition of a force model that can also be checked for a whole fleet at once. Called as
+                        condition(satellite, i) it checks one satellite at step i+1, and mask(fleet) checks every
+                        active satellite of a fleet.Fleet on its arrays, returning an array of booleans
+        """
+        self.check = check
+        self.mask = mask
+
+    def __call__(self, satellite, i):
+        return self.check(satellite, i)
+
+def during_phases(*phases):
+    """
+        during_phases - Condition that holds while the satellite is in any of the given mission phases
+    """
+    return Condition(lambda satellite, i: mission_phase(satellite) in phases,
+                     lambda fleet: np.isin(fleet.phases, phases))
+
+def below_earth_altitude(altitude):
+    """
+        below_earth_altitude - Condition that holds while the satellite is below the given altitude above the earth
+    """
+    return Condition(lambda satellite, i: satellite.alt_earth[i+1] < altitude,
+                     lambda fleet: fleet.alt_earth < altitude)
+
+def above_earth_altitude(altitude):
+    """
+        above_earth_altitude - Condition that holds while the satellite is above the given altitude above the earth
+    """
+    return Condition(lambda satellite, i: satellite.alt_earth[i+1] >= altitude,
+                     lambda fleet: fleet.alt_earth >= altitude)
+
+class ForceModel(ABC):
+    def __init__(self, name, conditions=()):
+        """
+            ForceModel - A perturbation force. It is only evaluated at steps where every one of its conditions, each
+                         a function condition(satellite, i) of the state at step i+1 or a Condition, holds. Subclasses
+                         implement acceleration
+        """
+        self.name = name
+        self.conditions = list(conditions)
+        self.calls = 0          # Satellite steps the model was evaluated for
+        self.skipped = 0        # Satellite steps a condition switched the model off for
+        self.elapsed = 0.0      # Time spent evaluating the model (s)
+
+    def is_enabled(self, satellite, i):
+        """
+            is_enabled - Checks the conditions of the model for a satellite at step i+1
+        """
+        for condition in self.conditions:
+            if not condition(satellite, i):
+                self.skipped += 1
+                return False
+        return True
+
+    def enabled_mask(self, fleet, candidates, i):
+        """
+            enabled_mask - Which of the active satellites of a fleet the model is enabled for at step i+1, out of the
+                           candidates, an array of booleans. A Condition is checked for every satellite at once, any
+                           other condition one satellite at a time
+        """
+        enabled = candidates
+        for condition in self.conditions:
+            if isinstance(condition, Condition):
+                enabled = enabled & condition.mask(fleet)
+            else:
+                enabled = np.array([bool(on) and condition(satellite, i)
+                                    for on, satellite in zip(enabled, fleet.active)])
+        self.skipped += int(np.count_nonzero(candidates)) - int(np.count_nonzero(enabled))
+        return enabled
+
+    @abstractmethod
+    def acceleration(self, x, y, time):
+        """
+            acceleration - x and y components of the perturbing acceleration at a position relative to the earth at a
+                           time. Takes floats or numpy arrays of positions
+        """
+
+    def record_timing(self, start, calls=1):
+        """
+            record_timing - Adds the time since start, from perf_counter, to the cost of the model
+        """
+        self.elapsed += perf_counter() - start
+        self.calls += calls
+
+    def timing(self):
+        """
+            timing - Calls, skips and time spent in the model
+        """
+        return {"name": self.name,
+                "calls": self.calls,
+                "skipped": self.skipped,
+                "elapsed": self.elapsed,
+                "mean_cost": self.elapsed / self.calls if self.calls else 0.0}
+
+class EarthJ2(ForceModel):
+    def __init__(self, j2=EARTH_J2, conditions=()):
+        """
+            EarthJ2 - Oblateness of the earth. The satellite stays in the equatorial plane, where the J2 acceleration
+                      points towards the centre of the earth and only depends on the distance from it
+        """
+        super().__init__("earth_j2", conditions)
+        self.j2 = j2
+        self.factor = 1.5 * j2 * Earth.mu * Earth.radius**2    # Constant part of the acceleration
+
+    def acceleration(self, x, y, time):
+        r_squared = x * x + y * y
+        scale = -self.factor / r_squared**2.5
+        return scale * x, scale * y
+
+class SolarThirdBody(ForceModel):
+    def __init__(self, sun_angle=0.0, table_spacing=3600, conditions=()):
+        """
+            SolarThirdBody - Gravity of the sun less the acceleration it gives the earth. The sun orbits the earth in a
+                             circle starting at sun_angle (degrees). Its position is tabulated every table_spacing
+                             seconds over one year and linearly interpolated in between
+        """
+        super().__init__("solar", conditions)
+        self.table_spacing = table_spacing
+        self.nodes = int(math.ceil(SUN_PERIOD / table_spacing))
+
+        start = sun_angle * (math.pi / 180)
+        angles = [start + 2 * math.pi * n * table_spacing / SUN_PERIOD for n in range(self.nodes + 1)]
+        self.sun_x = [SUN_DISTANCE * math.cos(angle) for angle in angles]
+        self.sun_y = [SUN_DISTANCE * math.sin(angle) for angle in angles]
+        self.indirect = SUN_MU / SUN_DISTANCE**3   # Acceleration of the earth towards the sun per metre
+
+    def sun_position(self, time):
+        """
+            sun_position - Interpolated position of the sun relative to the earth at any time
+        """
+        node, fraction = divmod((time % SUN_PERIOD) / self.table_spacing, 1.0)
+        n = min(int(node), self.nodes - 1)
+        return (self.sun_x[n] + fraction * (self.sun_x[n+1] - self.sun_x[n]),
+                self.sun_y[n] + fraction * (self.sun_y[n+1] - self.sun_y[n]))
+
+    def acceleration(self, x, y, time):
+        s_x, s_y = self.sun_position(time)
+        d_x = s_x - x
+        d_y = s_y - y
+        direct = SUN_MU / (d_x * d_x + d_y * d_y)**1.5
+        return direct * d_x - self.indirect * s_x, direct * d_y - self.indirect * s_y
+
+# Force models that can be chosen by name in scenario files
+FORCE_MODELS = {
+                "earth_j2": EarthJ2,
+                "solar": SolarThirdBody
+                }
+
+def register_force_model(name, model_class):
+    """
+        register_force_model - Makes a force model class available to scenario files by name
+    """
+    FORCE_MODELS[name] = model_class
+
+def create_force_model(settings):
+    """
+        create_force_model - Creates a force model from its settings in a scenario file. The name picks the model, the
+                             optional phases, min_earth_altitude and max_earth_altitude switch it on only where needed,
+                             and any other setting is passed to the model
+    """
+    settings = dict(settings)
+    model_class = FORCE_MODELS[settings.pop("name")]
+
+    conditions = []
+    if "phases" in settings:
+        conditions.append(during_phases(*settings.pop("phases")))
+    if "min_earth_altitude" in settings:
+        conditions.append(above_earth_altitude(settings.pop("min_earth_altitude")))
+    if "max_earth_altitude" in settings:
+        conditions.append(below_earth_altitude(settings.pop("max_earth_altitude")))
+
+    return model_class(conditions=conditions, **settings)
+
+def perturbation_acceleration(satellite, i):
+    """
+        perturbation_acceleration - Sum of the accelerations of every force model of the satellite enabled at step i+1
+    """
+    a_x = 0.0
+    a_y = 0.0
+    for model in satellite.force_models:
+        if model.is_enabled(satellite, i):
+            start = perf_counter()
+            p_x, p_y = model.acceleration(satellite.x[i+1], satellite.y[i+1], t[i+1])
+            model.record_timing(start)
+            a_x += p_x
+            a_y += p_y
+    return a_x, a_y
+
+def timing_report(models):
+    """
+        timing_report - Human readable cost of each force model
+    """
+    lines = []
+    for model in models:
+        timing = model.timing()
+        lines.append("%-8s %d calls, %d skipped, %.3f s, %.2f us per call" % \
+                     (timing["name"], timing["calls"], timing["skipped"], timing["elapsed"], timing["mean_cost"] * 1e6))
+    return "\n".join(lines)
@@ -1,4 +1,4 @@
-import numpy as np
+from ring_buffer import RingBuffer
 
 PHOTON_PARAMETERS = {
                      "EARTH_ALTITUDE": 1e6, 
@@ -18,4 +18,28 @@ t[0] = 0
 dt = 1
 
 # Dump to file parameters
-keyframe = np.arange(0, z, 500)
+keyframe_step = 500 # Steps between keyframes while coasting
+
+# Settings of the ring buffers of an open-ended run, None when the whole run is stored
+ring_buffer_settings = None
+
+def configure(steps=None, step_size=None, keyframe_spacing=None, ring_buffer=None):
+    """
+        configure - Changes the length of the simulation, the time step and the spacing of the keyframes dumped to file.
+                    ring_buffer is a dict of RingBuffer settings that makes the time vector a ring buffer for open-ended
+                    runs, see ring_buffer.enable_ring_buffers. The other modules take their own copies of these values,
+                    so this must be called before any of them are imported
+    """
+    global z, t, dt, keyframe_step, ring_buffer_settings
+
+    if steps is not None:
+        z = int(steps)
+        t = [None] * z
+        t[0] = 0
+    if step_size is not None:
+        dt = step_size
+    if keyframe_spacing is not None:
+        keyframe_step = int(keyframe_spacing)
+    if ring_buffer is not None:
+        ring_buffer_settings = dict(ring_buffer)
+        t = RingBuffer(0, **ring_buffer_settings)
@@ -13,6 +13,7 @@ from global_params import t
 from celestial_body import Moon, Earth
 from satellite import Photon
 import matplotlib.pyplot as plt
+import numpy as np
 import math
 
 # Set font size and dark mode
@@ -28,28 +29,38 @@ def graph_common_settings(i):
     plt.hlines(0, t[0], t[i+1], "gray", linewidth=0.5)
     plt.grid(color='white', linestyle='-', linewidth=1)
     
-def graph_position(i):
+def sample_trajectory(trajectory, samples=100000):
+    """
+        sample_trajectory - Evenly spaced times over a trajectory, with the position of the satellite and the moon at each
+    """
+    times = np.linspace(trajectory.t[0], trajectory.t[-1], samples)
+    x, y, v_x, v_y = trajectory.state_at(times)
+    moon_angle = 2 * math.pi / Moon.period * times + Moon.omega[0]
+    return times, x, y, Moon.dE * np.cos(moon_angle), Moon.dE * np.sin(moon_angle)
+
+def graph_position(i, trajectory):
     """
         graph_position - Graphs the X, Y position of the Photon satelite along with the altitude above the earth and moon
     """
+    times, x, y, moon_x, moon_y = sample_trajectory(trajectory)
     plt.figure(num=1, figsize=(8,8), dpi=100)
     plt.subplot(221)
     plt.title('t, Photon X position')
-    plt.plot(t, Photon.x, "orange")
+    plt.plot(times, x, "orange")
     graph_common_settings(i)
     plt.subplot(222)
     plt.title('t, Photon Y position')
-    plt.plot(t, Photon.y, "orange")
+    plt.plot(times, y, "orange")
     graph_common_settings(i)
     plt.subplot(223)
     plt.title('t, Photon Altitude Above Earth')
-    plt.plot(t, Photon.alt_earth, "orange")
+    plt.plot(times, np.hypot(x, y) - Earth.radius, "orange")
     plt.hlines(Photon.target_altitude, t[0], t[i+1], "gray", linewidth=0.5)
     plt.hlines(Photon.target_altitude_2, t[0], t[i+1], "gray", linewidth=0.5)
     graph_common_settings(i)
     plt.subplot(224)
     plt.title('t, Photon Altitude Above Moon')
-    plt.plot(t, Photon.alt_moon, "orange")
+    plt.plot(times, np.hypot(x - moon_x, y - moon_y) - Moon.radius, "orange")
     plt.hlines(Photon.target_moon_altitude, t[0], t[i+1], "gray", linewidth=0.5)
     graph_common_settings(i)
     plt.tight_layout(w_pad=2.0, h_pad=2.0)
@@ -152,14 +163,15 @@ def graph_angles(i):
     graph_angle_settings(i)
     plt.tight_layout(w_pad=2.0, h_pad=2.0)
 
-def graph_earth_proximity():
+def graph_earth_proximity(trajectory):
     """
         graph_earth_proximity - Plots the satelites altitude changes and Hohmann transfers to reach higher orbits
     """    
+    times, x, y, moon_x, moon_y = sample_trajectory(trajectory)
     fig = plt.figure(num=6, figsize=(8,8), dpi=100)
     ax = fig.add_subplot(1, 1, 1)
     plt.title("Earth Orbit Visualisation")
-    plt.plot(Photon.x, Photon.y, color="orange")
+    plt.plot(x, y, color="orange")
     plt.xlim(xmin=-Earth.radius - 3e7)
     plt.xlim(xmax=Earth.radius + 3e7)
     plt.ylim(ymin=-Earth.radius - 3e7)
@@ -169,33 +181,28 @@ def graph_earth_proximity():
                             color="blue", fill=None))
     ax.add_patch(plt.Circle((0,0), Photon.target_altitude_2 + Earth.radius, 
                             color="blue", fill=None))
-    ax.add_patch(plt.Circle((Photon.x[t.index(max(t))],
-                                       Photon.y[t.index(max(t))]), 
-                            5e4, color="orange", fill=True))
+    ax.add_patch(plt.Circle((x[-1], y[-1]), 5e4, color="orange", fill=True))
     plt.grid(color='white', linestyle='-', linewidth=1)
     
-def graph_moon_proximity(i):
+def graph_moon_proximity(trajectory):
     """
         graph_earth_proximity - Plots the satelites orbit changes around the moon
     """    
+    times, x, y, moon_x, moon_y = sample_trajectory(trajectory)
     fig = plt.figure(num=7, figsize=(8,8), dpi=100)
     ax = fig.add_subplot(1, 1, 1)
     plt.title("Lunar Orbit Visualisation")
-    plt.plot(Photon.x, Photon.y, color="orange")
-    plt.xlim(xmin=Moon.x[i+1] - 5.0e6)
-    plt.xlim(xmax=Moon.x[i+1] + 5.0e6)
-    plt.ylim(ymin=Moon.y[i+1] - 5.0e6)
-    plt.ylim(ymax=Moon.y[i+1] + 5.0e6)
+    plt.plot(x, y, color="orange")
+    plt.xlim(xmin=moon_x[-1] - 5.0e6)
+    plt.xlim(xmax=moon_x[-1] + 5.0e6)
+    plt.ylim(ymin=moon_y[-1] - 5.0e6)
+    plt.ylim(ymax=moon_y[-1] + 5.0e6)
 
     ax.add_patch(plt.Circle((0,0), Earth.radius, color="green", fill=None))
-    ax.add_patch(plt.Circle((Photon.x[t.index(max(t))],
-                                       Photon.y[t.index(max(t))]),
-                            5e4, color="orange", fill=True))
-    ax.add_patch(plt.Circle((Moon.x[t.index(max(t))],Moon.y[t.index(max(t))]), 
-                            5e4, color="#377EB8", fill=True))
-    ax.add_patch(plt.Circle((Moon.x[t.index(max(t))],Moon.y[t.index(max(t))]), 
-                            Moon.radius, color="#377EB8", fill=None))
-    ax.add_patch(plt.Circle((Moon.x[t.index(max(t))],Moon.y[t.index(max(t))]), 
+    ax.add_patch(plt.Circle((x[-1], y[-1]), 5e4, color="orange", fill=True))
+    ax.add_patch(plt.Circle((moon_x[-1], moon_y[-1]), 5e4, color="#377EB8", fill=True))
+    ax.add_patch(plt.Circle((moon_x[-1], moon_y[-1]), Moon.radius, color="#377EB8", fill=None))
+    ax.add_patch(plt.Circle((moon_x[-1], moon_y[-1]), 
                             Moon.radius + Photon.target_moon_altitude, 
                             color="purple", fill=None))    
     plt.grid(color='white', linestyle='-', linewidth=1)
@@ -244,16 +251,17 @@ def graph_earth_moon_exact():
                             5e4, color="orange", fill=True))
     plt.grid(color='white', linestyle='-', linewidth=1)
     
-def graph_earth_moon_margin():
+def graph_earth_moon_margin(trajectory):
     """
         graph_earth_moon_margin - Plot that shows the Hohmann transfer to reach the orbit of the moon, 
                                   but additionally adds the orbit of the moon around the earth for context
     """
+    times, x, y, moon_x, moon_y = sample_trajectory(trajectory)
     fig=plt.figure(num=10, figsize=(8,8), dpi=100)
     ax=fig.add_subplot(1,1,1)
     plt.title('Earth Moon')
-    plt.plot(Moon.x, Moon.y, color="#377EB8")
-    plt.plot(Photon.x, Photon.y, color="orange")
+    plt.plot(moon_x, moon_y, color="#377EB8")
+    plt.plot(x, y, color="orange")
     plt.xlim(xmin=-Moon.dE - 1e8)
     plt.xlim(xmax=Moon.dE + 1e8)
     plt.ylim(ymin=-Moon.dE - 1e8)
@@ -262,11 +270,8 @@ def graph_earth_moon_margin():
     plt.vlines(0, -Moon.dE - 1e8, Moon.dE + 1e8, "white", linewidth=1.0)
     ax.add_patch(plt.Circle((0,0), Moon.dE, color="gray", fill=None))
     ax.add_patch(plt.Circle((0,0), Earth.radius, color="green", fill=None))
-    ax.add_patch(plt.Circle((Moon.x[t.index(max(t))],Moon.y[t.index(max(t))]), 
-                            Moon.radius, color="#377EB8", fill=None))
-    ax.add_patch(plt.Circle((Photon.y[t.index(max(t))],
-                                       Photon.y[t.index(max(t))]), 
-                            5e4, color="orange", fill=True))
+    ax.add_patch(plt.Circle((moon_x[-1], moon_y[-1]), Moon.radius, color="#377EB8", fill=None))
+    ax.add_patch(plt.Circle((x[-1], y[-1]), 5e4, color="orange", fill=True))
     plt.grid(color='white', linestyle='-', linewidth=1)
 
 def graph_deorbit_site(i):
@@ -288,6 +293,37 @@ def graph_deorbit_site(i):
     ax.add_patch(plt.Circle((Moon.x[Photon.deorbit_time],Moon.y[Photon.deorbit_time]), Moon.radius, color="#377EB8", fill=None))
     plt.grid(color='white', linestyle='-', linewidth=1)
       
+def graph_dense_trajectory(trajectory, samples=100000):
+    """
+        graph_dense_trajectory - Plots the orbit of the Photon satellite interpolated from the sparse nodes of a trajectory,
+                                 with the stored nodes marked on top
+    """
+    times, x, y, moon_x, moon_y = sample_trajectory(trajectory, samples)
+    fig=plt.figure(num=12, figsize=(8,8), dpi=100)
+    ax=fig.add_subplot(1,1,1)
+    plt.title('Interpolated Trajectory')
+    plt.plot(x, y, color="orange")
+    plt.plot(trajectory.x, trajectory.y, ".", color="white", markersize=2)
+    ax.add_patch(plt.Circle((0,0), Earth.radius, color="green", fill=None))
+    plt.grid(color='white', linestyle='-', linewidth=1)
+      
+def graph_ring_history():
+    """
+        graph_ring_history - Plots the altitude above the earth and the moon for an open-ended run held in ring buffers.
+                             The decimated history gives the long-term context and the ring buffer the recent detail
+    """
+    times = t.series()[1]
+    plt.figure(num=13, figsize=(8,8), dpi=100)
+    plt.subplot(211)
+    plt.title('t, Photon Altitude Above Earth')
+    plt.plot(times, Photon.alt_earth.series()[1], "orange")
+    plt.grid(color='white', linestyle='-', linewidth=1)
+    plt.subplot(212)
+    plt.title('t, Photon Altitude Above Moon')
+    plt.plot(times, Photon.alt_moon.series()[1], "orange")
+    plt.grid(color='white', linestyle='-', linewidth=1)
+    plt.tight_layout(w_pad=2.0, h_pad=2.0)
+
 def show_plots():
     """
         show_plots - Simply shows the plots
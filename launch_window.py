@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: launch_window.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Searches the initial phase angle of the moon and the departure time of the trans-lunar injection
+                  burn for launch windows that reach the target lunar altitude. Candidates are screened with an
+                  analytic Hohmann transfer before the survivors are propagated in parallel
+"""
+
+from global_params import t
+from celestial_body import Earth, Moon
+from satellite import Photon, reset_photon
+from propagate import propagate_photon
+from multiprocessing import Pool
+import numpy as np
+import argparse
+import math
+
+def wrap_angle(angle):
+    """
+        wrap_angle - Wraps an angle into the range -pi to pi
+    """
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+def reference_departure():
+    """
+        reference_departure - Propagates the Photon satellite up to its trans-lunar injection burn with no departure delay.
+                              The orbit raising around the earth does not depend on the moon, so this only needs to run once.
+                              Returns the time, angle and radius of the satellite at the burn
+    """
+    reset_photon()
+    i = propagate_photon(stop_condition=lambda i: Photon.thrust_earth_in_ellipse_called == 2)
+
+    if Photon.thrust_earth_in_ellipse_called < 2:
+        raise RuntimeError("The Photon satellite never performed its trans-lunar injection burn")
+
+    return t[i+1], Photon.theta[i+1], Photon.r[i+1]
+
+def screen_window(moon_angle, departure_time, reference):
+    """
+        screen_window - Coarse screen of a single launch window. Predicts when and where the trans-lunar injection burn
+                        happens for the given departure time, then returns the predicted burn time, the Hohmann transfer
+                        time and the angle the moon leads the satellite by when it reaches the moons orbit
+    """
+    t_ref, theta_ref, r_park = reference
+    n_park = math.sqrt(Earth.mu / r_park**3) # Mean motion of the parking orbit
+
+    # The burn happens on the first step in the fourth quadrant at or after the departure time
+    if departure_time <= t_ref:
+        t_burn, theta_burn = t_ref, theta_ref
+    else:
+        theta_dep = (theta_ref + n_park * (departure_time - t_ref)) % (2 * math.pi)
+        if theta_dep >= 3 * math.pi / 2:
+            t_burn, theta_burn = departure_time, theta_dep
+        else:
+            t_burn = departure_time + (3 * math.pi / 2 - theta_dep) / n_park
+            theta_burn = 3 * math.pi / 2
+
+    # Half an orbit of the transfer ellipse out to the moons distance
+    a_transfer = (r_park + Moon.dE) / 2
+    t_transfer = math.pi * math.sqrt(a_transfer**3 / Earth.mu)
+
+    moon_arrival = moon_angle + 2 * math.pi / Moon.period * (t_burn + t_transfer)
+    satellite_arrival = theta_burn + math.pi
+
+    return t_burn, t_transfer, wrap_angle(moon_arrival - satellite_arrival)
+
+def evaluate_window(candidate):
+    """
+        evaluate_window - Runs the full propagation for a single launch window, stopping as soon as the satellite
+                          reaches the target lunar altitude or once it has clearly missed the moon
+    """
+    Moon.set_moon_angle(candidate["moon_angle"])
+    reset_photon(departure_time=candidate["departure_time"])
+
+    # Give up once twice the transfer time has passed since the burn
+    give_up = candidate["t_burn"] + 2 * candidate["t_transfer"]
+
+    def stop_condition(i):
+        return Photon.thrust_moon_in_circle_called > 0 or t[i+1] > give_up
+
+    i = propagate_photon(stop_condition)
+
+    result = dict(candidate)
+    result["reached_target"] = Photon.thrust_moon_in_circle_called > 0
+    result["has_deorbited"] = Photon.has_deorbited
+    result["min_alt_moon"] = min(Photon.alt_moon[1:i+2])
+    result["end_time"] = t[i+1]
+    return result
+
+def search_launch_windows(moon_angles, departure_times, tolerance=10 * (math.pi / 180), max_candidates=None, processes=None):
+    """
+        search_launch_windows - Scans every combination of initial moon angle (radians) and departure time (seconds).
+                                Combinations where the moon is not within the tolerance of the arrival point are
+                                pruned, the remaining ones are propagated in parallel. Returns the results of the full
+                                propagations, launch windows that reach the target lunar altitude first
+    """
+    reference = reference_departure()
+
+    candidates = []
+    for moon_angle in moon_angles:
+        for departure_time in departure_times:
+            t_burn, t_transfer, phase_error = screen_window(moon_angle, departure_time, reference)
+            if abs(phase_error) <= tolerance:
+                candidates.append({"moon_angle": moon_angle,
+                                   "departure_time": departure_time,
+                                   "t_burn": t_burn,
+                                   "t_transfer": t_transfer,
+                                   "phase_error": phase_error})
+
+    # Closest to the ideal phasing first
+    candidates.sort(key=lambda candidate: abs(candidate["phase_error"]))
+    if max_candidates is not None:
+        candidates = candidates[:max_candidates]
+
+    print("Screened", len(moon_angles) * len(departure_times), "launch windows, propagating", len(candidates))
+
+    with Pool(processes) as pool:
+        results = pool.map(evaluate_window, candidates)
+
+    results.sort(key=lambda result: (not result["reached_target"], result["min_alt_moon"]))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the initial moon angle and departure time for lunar launch windows")
+    parser.add_argument("--angles", type=int, default=72, help="Number of initial moon angles to scan over a full orbit")
+    parser.add_argument("--departures", type=float, nargs="+", default=[0.0], help="Departure times to scan (s)")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Phase tolerance of the coarse screen (deg)")
+    parser.add_argument("--max-candidates", type=int, default=None, help="Maximum number of windows to propagate")
+    parser.add_argument("--processes", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args()
+
+    results = search_launch_windows(np.linspace(0, 2 * math.pi, args.angles, endpoint=False),
+                                    args.departures,
+                                    args.tolerance * (math.pi / 180),
+                                    args.max_candidates,
+                                    args.processes)
+
+    for result in results:
+        print("Moon angle: %7.2f deg  Departure: %9.0f s  Phase error: %6.2f deg  Min lunar altitude: %12.0f m  Reached: %s" % \
+              (result["moon_angle"] * (180 / math.pi), result["departure_time"], result["phase_error"] * (180 / math.pi),
+               result["min_alt_moon"], result["reached_target"]))
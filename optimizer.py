@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: optimizer.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Searches the thrust, burn time and transfer orbit altitude of the Photon satellite for the mission
+                  with the lowest total delta-v that still ends in capture around the moon. Uses differential
+                  evolution, where each generation is propagated in parallel
+"""
+
+from global_params import t, dt
+from satellite import Photon, reset_photon
+from propagate import propagate_photon
+from ephemeris import publish_moon_ephemeris, attach_moon_ephemeris
+from multiprocessing import Pool
+import numpy as np
+import argparse
+
+# Parameters searched by the optimizer along with their lower and upper bounds,
+# named after the arguments of satellite_settings
+OPTIMIZER_BOUNDS = {
+                    "f_r": (500.0, 3000.0),                   # Thrust of the initial burn (N)
+                    "turn_off": (10.0, 120.0),                # Length of the initial burn (s)
+                    "target_altitude_2": (5e6, 3e7)           # Altitude of the second parking orbit (m)
+                    }
+
+# Penalties added to the delta-v of candidates that do not get captured by the moon (m/s)
+MISSED_PENALTY = 1e5
+DEORBIT_PENALTY = 2e5
+
+def has_missed_moon(i):
+    """
+        has_missed_moon - After the trans-lunar injection burn the satellite has clearly missed the moon once it is
+                          both falling back towards the earth and moving away from the moon
+    """
+    if Photon.thrust_earth_in_ellipse_called < 2 or Photon.thrust_moon_in_circle_called > 0:
+        return False
+
+    falling_to_earth = Photon.x[i+1] * Photon.v_x[i+1] + Photon.y[i+1] * Photon.v_y[i+1] < 0
+    leaving_moon = Photon.m_r[i+1] > Photon.m_r[i]
+    return falling_to_earth and leaving_moon
+
+def evaluate_design(design):
+    """
+        evaluate_design - Propagates a single set of mission parameters until the satellite is captured by the moon,
+                          deorbits, or clearly misses the moon. Returns the cost and a summary of the run
+    """
+    reset_photon(**design)
+
+    def stop_condition(i):
+        return Photon.thrust_moon_in_circle_called > 0 or has_missed_moon(i)
+
+    i = propagate_photon(stop_condition)
+
+    # Thrust is applied over every step that has been integrated. The run stops on the step the capture burn is
+    # written, so that burn is counted as well
+    captured = Photon.thrust_moon_in_circle_called > 0
+    last = i + 1 if captured else i
+    delta_v = sum(Photon.f_r[:last+1]) * dt / Photon.mass
+    min_alt_moon = min(Photon.alt_moon[1:i+2])
+
+    if captured:
+        cost = delta_v
+    elif Photon.has_deorbited:
+        cost = delta_v + DEORBIT_PENALTY
+    else:
+        # Rank missed candidates by how close they got to the moon
+        cost = delta_v + MISSED_PENALTY + min_alt_moon / 1e3
+
+    return {"design": design,
+            "cost": cost,
+            "delta_v": delta_v,
+            "captured": captured,
+            "has_deorbited": Photon.has_deorbited,
+            "min_alt_moon": min_alt_moon,
+            "end_time": t[i+1]}
+
+def to_designs(population):
+    """
+        to_designs - Converts rows of the population array into keyword arguments for reset_photon
+    """
+    names = list(OPTIMIZER_BOUNDS)
+    return [{name: float(value) for name, value in zip(names, row)} for row in population]
+
+def optimize_transfer(population_size=16, generations=20, mutation=0.7, crossover=0.9, seed=None, processes=None):
+    """
+        optimize_transfer - Differential evolution (rand/1/bin) over the parameters in OPTIMIZER_BOUNDS. Every generation
+                            is evaluated as one batch on a process pool that shares a single copy of the moons ephemeris.
+                            Returns the best result found
+    """
+    rng = np.random.default_rng(seed)
+    lower, upper = np.array(list(OPTIMIZER_BOUNDS.values())).T
+    population = lower + rng.random((population_size, len(lower))) * (upper - lower)
+
+    ephemeris = publish_moon_ephemeris()
+    try:
+        with Pool(processes, initializer=attach_moon_ephemeris, initargs=(ephemeris.name, ephemeris.shape)) as pool:
+            results = pool.map(evaluate_design, to_designs(population))
+            costs = np.array([result["cost"] for result in results])
+
+            for generation in range(generations):
+                # Mutate three distinct other members and cross over with the current member
+                trials = np.empty_like(population)
+                for k in range(population_size):
+                    choices = [j for j in range(population_size) if j != k]
+                    a, b, c = population[rng.choice(choices, 3, replace=False)]
+                    mutant = np.clip(a + mutation * (b - c), lower, upper)
+                    mask = rng.random(len(lower)) < crossover
+                    mask[rng.integers(len(lower))] = True
+                    trials[k] = np.where(mask, mutant, population[k])
+
+                trial_results = pool.map(evaluate_design, to_designs(trials))
+
+                # Keep whichever of the member and its trial is cheaper
+                for k, result in enumerate(trial_results):
+                    if result["cost"] <= costs[k]:
+                        population[k] = trials[k]
+                        costs[k] = result["cost"]
+                        results[k] = result
+
+                best = results[int(np.argmin(costs))]
+                print("Generation", generation + 1, "best delta-v:", round(best["delta_v"], 2), "m/s captured:", best["captured"])
+    finally:
+        ephemeris.close()
+
+    return results[int(np.argmin(costs))]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the Photon mission parameters for the minimum delta-v lunar capture")
+    parser.add_argument("--population", type=int, default=16, help="Number of candidates in each generation")
+    parser.add_argument("--generations", type=int, default=20, help="Number of generations to evolve")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the random number generator")
+    parser.add_argument("--processes", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args()
+
+    best = optimize_transfer(args.population, args.generations, seed=args.seed, processes=args.processes)
+
+    print("Best parameters:", best["design"])
+    print("Total delta-v:", best["delta_v"], "m/s  Captured:", best["captured"], " Min lunar altitude:", best["min_alt_moon"], "m")
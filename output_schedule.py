@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: output_schedule.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Decides which steps of the simulation are recorded for the dump to file. Records every step of a
+                  burn and of a rapid change in acceleration, often during close approaches to the moon and only
+                  every keyframe during coasts
+"""
+
+from global_params import dt, keyframe_step
+
+class OutputSchedule:
+    def __init__(self, coast_spacing=keyframe_step, approach_spacing=50, approach_altitude=1e7, rate_threshold=1e-3,
+                 burn_threshold=1.0):
+        """
+            OutputSchedule - Steps between records while coasting, steps between records closer to the moon than
+                             approach_altitude, the relative change in acceleration over one step above which every
+                             step is recorded, and the delta-v of a single step (m/s) above which it counts as a burn.
+                             Smaller corrections, such as holding a circular orbit around the moon, are not burns
+        """
+        self.coast_spacing = coast_spacing
+        self.approach_spacing = approach_spacing
+        self.approach_altitude = approach_altitude
+        self.rate_threshold = rate_threshold
+        self.burn_threshold = burn_threshold
+        self.steps = [0]    # Steps recorded so far, starting with the initial conditions
+
+    def should_record(self, satellite, i):
+        """
+            should_record - Determines whether step i+1 of the satellite is recorded, once its acceleration is known
+        """
+        # Either end of a burn
+        if max(abs(satellite.f_r[i+1]), abs(satellite.f_r[i])) * dt / satellite.mass >= self.burn_threshold:
+            return True
+
+        # Acceleration changing quickly
+        if abs(satellite.a[i+1] - satellite.a[i]) > self.rate_threshold * abs(satellite.a[i]):
+            return True
+
+        if satellite.alt_moon[i+1] < self.approach_altitude:
+            spacing = self.approach_spacing
+        else:
+            spacing = self.coast_spacing
+
+        return i + 1 - self.steps[-1] >= spacing
+
+    def record(self, i):
+        """
+            record - Notes that step i+1 has been recorded
+        """
+        self.steps.append(i + 1)
@@ -12,21 +12,18 @@ File Description: Runs the main simulation, plots the data and dumps the data to
 from global_params import z, t, dt
 from celestial_body import Earth, Moon
 from satellite import Photon
+from trajectory import Trajectory
+from ring_buffer import RingBuffer
+import itertools
 import math
-import graphing
 
 # Initialise lists
+temp_t_list = []
 temp_moon_x_list = []
 temp_moon_y_list = []
 temp_Photon_x_list = []
 temp_Photon_y_list = []
 
-# Append initial conditions
-temp_moon_x_list.append(Moon.x[0] / Earth.radius)
-temp_moon_y_list.append(Moon.y[0] / Earth.radius)
-temp_Photon_x_list.append(Photon.x[0] / Earth.radius)
-temp_Photon_y_list.append(Photon.y[0] / Earth.radius)
-
 def run_simulation():
     """
         run_simulation - Loops through all time, and calculates the position of the celestial bodies, and the Photon satelite
@@ -35,51 +32,119 @@ def run_simulation():
 
     print("Running propagator please wait...")
 
-    for i in range(z - 1):
-        
-        t[i+1] = t[i] + dt
+    i = propagate_photon()
         
-        Moon.calc_position(i)
-        Moon.calc_moon_angle(i)
+    dump_to_file("./data.csv")  
+    plot_results(i)
+
+def propagate_photon(stop_condition=None):
+    """
+        propagate_photon - Runs the main simulation loop from the initial conditions and returns the index of the last step.
+                           The loop ends early if the satellite deorbits, or when stop_condition(i) returns True
+    """
+    reset_dump_lists()
+
+    for i in range(z - 1):
+        if step_simulation(i, stop_condition):
+            break
+        else:
+            pass
         
-        Photon.calc_position(i,
-                            temp_moon_x_list,
-                            temp_moon_y_list,
-                            temp_Photon_x_list,
-                            temp_Photon_y_list)
+    return i
+
+def propagate_until(stop_condition, max_steps=None):
+    """
+        propagate_until - Runs the main simulation loop with no fixed end, until the satellite deorbits or stop_condition(i)
+                          returns True, or after max_steps steps if given. Returns the index of the last step.
+                          Runs past z steps need the state vectors in ring buffers, see ring_buffer.enable_ring_buffers
+                          and the ring_buffer and max_steps keys of batch scenarios
+    """
+    reset_dump_lists()
+
+    for i in itertools.count():
+        stop = step_simulation(i, stop_condition)
         
-        Photon.calc_velocity(i)
-        Photon.calc_force(i)
-        Photon.calc_angles(i)
-        Photon.calc_acceleration(i)
-        Photon.calc_deorbit(i)
+        # Only the decimated history of the thrust is kept, so burns are logged as they happen
+        if Photon.burn_log is not None:
+            Photon.burn_log.record(i)
         
-        if Photon.has_deorbited:
+        if stop or (max_steps is not None and i + 1 >= max_steps):
             break
         else:
             pass
         
-    dump_to_file("./data.csv")  
-    plot_results(i)
+    return i
+
+def step_simulation(i, stop_condition=None):
+    """
+        step_simulation - Advances the moon and the Photon satellite from step i to step i+1. Returns True when the
+                          simulation should end
+    """
+    t[i+1] = t[i] + dt
+    
+    # A precomputed ephemeris already holds the moons position for every step
+    if not Moon.has_ephemeris:
+        Moon.calc_position(i)
+        Moon.calc_moon_angle(i)
+    
+    Photon.calc_position(i)
+    Photon.calc_velocity(i)
+    Photon.calc_force(i)
+    Photon.calc_angles(i)
+    Photon.calc_acceleration(i)
+    Photon.record_output(i,
+                        temp_t_list,
+                        temp_moon_x_list,
+                        temp_moon_y_list,
+                        temp_Photon_x_list,
+                        temp_Photon_y_list)
+    Photon.calc_deorbit(i)
+    
+    # The stop condition also sees the step the satellite deorbited on
+    stop = stop_condition is not None and stop_condition(i)
+    
+    return Photon.has_deorbited or stop
+
+def reset_dump_lists():
+    """
+        reset_dump_lists - Clears out any previous run from the lists dumped to file and appends the initial conditions
+    """
+    for temp_list in (temp_t_list, temp_moon_x_list, temp_moon_y_list, temp_Photon_x_list, temp_Photon_y_list):
+        del temp_list[:]
+    temp_t_list.append(t[0])
+    temp_moon_x_list.append(Moon.x[0] / Earth.radius)
+    temp_moon_y_list.append(Moon.y[0] / Earth.radius)
+    temp_Photon_x_list.append(Photon.x[0] / Earth.radius)
+    temp_Photon_y_list.append(Photon.y[0] / Earth.radius)
 
 def plot_results(i):
     """
         plot_results - Will take the state vectors and plot them, if the vehicle fails to escape earths gravity it will deorbit and crash
     """
     
-    if Photon.has_deorbited:
+    # Only import matplotlib when plotting, so headless runs never load it
+    import graphing
+    
+    if isinstance(t, RingBuffer):
+        # Only the decimated history of an open-ended run is left to plot
+        graphing.graph_ring_history()
+    elif Photon.has_deorbited:
         # Only show deorbit plot
         graphing.graph_deorbit_site(i)
     else:
+        # Position plots are interpolated from the sparse trajectory nodes
+        trajectory = Trajectory.from_satellite(Photon, t, i + 1)
+        
         # Show all graphs
-        graphing.graph_position(i)
+        graphing.graph_position(i, trajectory)
         graphing.graph_velocity(i)
         graphing.graph_acceleration(i)
         graphing.graph_force(i)
         graphing.graph_angles(i)
-        graphing.graph_earth_proximity()
-        graphing.graph_moon_proximity(i)
-        graphing.graph_earth_moon_margin()
+        graphing.graph_earth_proximity(trajectory)
+        graphing.graph_moon_proximity(trajectory)
+        graphing.graph_earth_moon_margin(trajectory)
+        graphing.graph_dense_trajectory(trajectory)
         
         # UNCOMMENT IF YOU WISH TO SEE THESE PLOTS
         #graphing.graph_earth_moon_exact()
@@ -89,13 +154,34 @@ def plot_results(i):
     
 def dump_to_file(filename):
     """
-        dump_to_file - Simple dump of vehicle x, y position and the moons x, y position. Can be easily expanded on it more data is of interest
+        dump_to_file - Simple dump of the recorded times along with the vehicle x, y position and the moons x, y position. Can be easily expanded on it more data is of interest
+    """
+    write_dump(filename, temp_t_list, temp_moon_x_list, temp_moon_y_list, temp_Photon_x_list, temp_Photon_y_list)
+
+def dump_satellite_to_file(filename, satellite):
+    """
+        dump_satellite_to_file - Same dump as dump_to_file for any satellite, such as a vehicle of a fleet, taken from
+                                 the steps its output schedule recorded
+    """
+    steps = satellite.output_schedule.steps
+    write_dump(filename,
+               [t[k] for k in steps],
+               [Moon.x[k] / Earth.radius for k in steps],
+               [Moon.y[k] / Earth.radius for k in steps],
+               [satellite.x[k] / Earth.radius for k in steps],
+               [satellite.y[k] / Earth.radius for k in steps])
+
+def write_dump(filename, t_list, moon_x_list, moon_y_list, satellite_x_list, satellite_y_list):
+    """
+        write_dump - Writes the lists of times, moon positions and satellite positions to file
     """
     # Dumb lists of satellite position and moon position
-    open(filename, "w").write("temp_moon_x_list = " + str(temp_moon_x_list) + '\n' \
-                                + "temp_moon_y_list = " + str(temp_moon_y_list) + "\n" \
-                                + "temp_Photon_x_list = " + str(temp_Photon_x_list) + "\n" \
-                                + "temp_Photon_y_list = " + str(temp_Photon_y_list) + '\n')
+    open(filename, "w").write("temp_t_list = " + str(t_list) + '\n' \
+                                + "temp_moon_x_list = " + str(moon_x_list) + '\n' \
+                                + "temp_moon_y_list = " + str(moon_y_list) + "\n" \
+                                + "temp_Photon_x_list = " + str(satellite_x_list) + "\n" \
+                                + "temp_Photon_y_list = " + str(satellite_y_list) + '\n')
     
 # Run the simulation
-run_simulation()
\ No newline at end of file
+if __name__ == "__main__":
+    run_simulation()
\ No newline at end of file
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: regression.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Differential regression harness. Runs the reference scenarios and compares them against stored golden
+                  trajectories, event tables and burn tables, channel by channel, reporting where and when each channel
+                  first diverges rather than a bare pass or fail. Run with --update to regenerate the golden files
+"""
+
+import multiprocessing
+import argparse
+import glob
+import time
+import sys
+import os
+import numpy as np
+
+# Reference scenarios and the golden files produced from them
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios", "regression")
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+# Steps between samples of the golden trajectory, on top of the first and last step of every burn
+SAMPLE_SPACING = 50
+
+# Absolute and relative tolerance of each channel, a sample diverges when |new - golden| > absolute + relative * |golden|
+CHANNEL_TOLERANCES = {
+                      "x": (1.0, 1e-9),             # m
+                      "y": (1.0, 1e-9),             # m
+                      "v_x": (1e-3, 1e-9),          # m/s
+                      "v_y": (1e-3, 1e-9),          # m/s
+                      "alt_earth": (1.0, 1e-9),     # m
+                      "alt_moon": (1.0, 1e-9),      # m
+                      "a": (1e-6, 1e-9),            # m/s^2
+                      "f_r": (1e-6, 1e-9)           # N
+                      }
+
+# Largest difference in the time of an event or the start and end of a burn before it counts as diverged (s)
+EVENT_TIME_TOLERANCE = 1e-3
+
+# Largest difference in the delta-v of a burn before it counts as diverged (m/s)
+BURN_DELTA_V_TOLERANCE = 1e-3
+
+def record_reference(scenario):
+    """
+        record_reference - Flies a scenario and samples the channels, event table and burn table of each of its
+                           satellites, the Photon satellite or every vehicle of a fleet. Channels are arrays with a row
+                           per satellite, and steps after a satellite deorbited are nan. The simulation modules are
+                           configured and imported here, so this must run in a fresh process
+    """
+    from batch import configure_scenario, fly_photon, fly_fleet, vehicle_last_step, vehicle_names
+
+    configure_scenario(scenario)
+
+    from satellite import Photon
+    from analytics import build_index
+    from global_params import t
+
+    start = time.perf_counter()
+    if "vehicles" in scenario:
+        detectors, i = fly_fleet(scenario)
+        names = vehicle_names(scenario)
+    else:
+        detector, i = fly_photon(scenario)
+        detectors, names = [detector], [scenario["name"]]
+    elapsed = time.perf_counter() - start
+    satellites = [detector.satellite for detector in detectors]
+
+    # Events and burns of a fleet are named after their vehicle
+    events = []
+    burns = []
+    for name, detector in zip(names, detectors):
+        prefix = name + ":" if len(detectors) > 1 else ""
+        events += [(prefix + row["name"], row["time"]) for row in detector.table]
+        satellite_last = vehicle_last_step(detector.satellite, i) + 1
+        burns += [(prefix + "burn", burn) for burn in build_index(detector.satellite, t, satellite_last).burns]
+
+    # The burn table holds the burns themselves, the channels are only sampled either side of them
+    last = i + 1
+    steps = set(range(0, last + 1, SAMPLE_SPACING)) | {last}
+    for name, burn in burns:
+        steps |= {step for step in (burn["start_step"], burn["end_step"]) if step <= last}
+    steps = sorted(steps)
+
+    run = {"name": scenario["name"],
+           "elapsed": elapsed,
+           "last": last,
+           "has_deorbited": any(satellite.has_deorbited for satellite in satellites),
+           "captured": all(satellite.thrust_moon_in_circle_called > 0 for satellite in satellites),
+           "steps": np.array(steps),
+           "t": np.array([t[k] for k in steps], dtype=float)}
+
+    run["event_names"] = np.array([name for name, when in events], dtype=str)
+    run["event_times"] = np.array([when for name, when in events], dtype=float)
+    run["burn_names"] = np.array([name for name, burn in burns], dtype=str)
+    run["burn_start_times"] = np.array([burn["start_time"] for name, burn in burns], dtype=float)
+    run["burn_end_times"] = np.array([burn["end_time"] for name, burn in burns], dtype=float)
+    run["burn_delta_v"] = np.array([burn["delta_v"] for name, burn in burns], dtype=float)
+
+    # Steps a satellite never reached are None in its state vectors, which become nan
+    for channel in CHANNEL_TOLERANCES:
+        run[channel] = np.array([[getattr(satellite, channel)[k] for k in steps] for satellite in satellites],
+                                dtype=float)
+
+    return run
+
+def golden_file(name):
+    return os.path.join(GOLDEN_DIR, name + ".npz")
+
+def save_golden(run):
+    """
+        save_golden - Writes a run to its golden file
+    """
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    arrays = {key: value for key, value in run.items() if key not in ("name", "elapsed")}
+    np.savez_compressed(golden_file(run["name"]), **arrays)
+
+def load_golden(name):
+    """
+        load_golden - Reads the golden run of a scenario
+    """
+    with np.load(golden_file(name)) as data:
+        golden = {key: data[key] for key in data.files}
+    for key in ("last", "has_deorbited", "captured"):
+        golden[key] = golden[key].item()
+    golden["name"] = name
+    return golden
+
+class RegressionReport:
+    def __init__(self, name, elapsed):
+        """
+            RegressionReport - Differences between a run of a reference scenario and its golden run
+        """
+        self.name = name
+        self.elapsed = elapsed          # Wall time of the propagation (s)
+        self.outcome = []               # Differences in how the run ended
+        self.channels = []              # First divergence and largest error of each channel
+        self.events = []                # Events that are missing, extra or at a different time
+        self.burns = []                 # Burns that are missing, extra, at a different time or of a different size
+
+    @property
+    def passed(self):
+        return not self.outcome and not self.events and not self.burns and all(row["first_step"] is None for row in self.channels)
+
+    def report(self):
+        """
+            report - Human readable summary of the comparison
+        """
+        lines = ["%s: %s in %.2f s" % (self.name, "PASS" if self.passed else "DIVERGED", self.elapsed)]
+        lines += ["  " + difference for difference in self.outcome]
+
+        for row in self.channels:
+            if row["first_step"] is None:
+                lines.append("  %-9s ok, max error %.3g" % (row["channel"], row["max_error"]))
+            else:
+                lines.append("  %-9s diverges at step %d (T+%.0f s) by %.3g, max error %.3g at T+%.0f s" % \
+                             (row["channel"], row["first_step"], row["first_time"], row["first_error"],
+                              row["max_error"], row["max_time"]))
+
+        for event in self.events:
+            lines.append("  event %d: %s" % (event["index"], event["difference"]))
+
+        for burn in self.burns:
+            lines.append("  burn %d: %s" % (burn["index"], burn["difference"]))
+
+        return "\n".join(lines)
+
+def compare_runs(run, golden):
+    """
+        compare_runs - Compares a run against the golden run of the same scenario. Channels are only compared over the
+                       steps both of them sampled
+    """
+    report = RegressionReport(run["name"], run["elapsed"])
+
+    for key, label in (("last", "last step"), ("has_deorbited", "deorbited"), ("captured", "captured")):
+        if run[key] != golden[key]:
+            report.outcome.append("%s is %s, golden run %s" % (label, run[key], golden[key]))
+
+    common, k_run, k_golden = np.intersect1d(run["steps"], golden["steps"], return_indices=True)
+    for channel, (absolute, relative) in CHANNEL_TOLERANCES.items():
+        if run[channel].shape[0] != golden[channel].shape[0]:
+            report.outcome.append("%d satellites, golden run %d" % (run[channel].shape[0], golden[channel].shape[0]))
+            break
+
+        new = run[channel][:, k_run]
+        old = golden[channel][:, k_golden]
+        error = np.abs(new - old)
+        # A nan in only one of the runs, such as a satellite deorbiting at a different step, always diverges
+        error[np.isnan(new) & np.isnan(old)] = 0.0
+        error[np.isnan(error)] = np.inf
+
+        # First sample where any satellite diverges
+        diverged = np.flatnonzero(np.any(error > absolute + relative * np.nan_to_num(np.abs(old)), axis=0))
+        worst = np.unravel_index(np.argmax(error), error.shape) if error.size else (0, 0)
+
+        row = {"channel": channel, "first_step": None, "first_time": None, "first_error": 0.0,
+               "max_error": float(error[worst]) if error.size else 0.0,
+               "max_time": float(golden["t"][k_golden[worst[1]]]) if error.size else 0.0}
+        if len(diverged):
+            k = diverged[0]
+            row.update({"first_step": int(common[k]), "first_time": float(golden["t"][k_golden[k]]),
+                        "first_error": float(np.max(error[:, k]))})
+        report.channels.append(row)
+
+    for k in range(max(len(run["event_names"]), len(golden["event_names"]))):
+        if k >= len(run["event_names"]):
+            difference = "missing %s at T+%.3f s" % (golden["event_names"][k], golden["event_times"][k])
+        elif k >= len(golden["event_names"]):
+            difference = "extra %s at T+%.3f s" % (run["event_names"][k], run["event_times"][k])
+        elif run["event_names"][k] != golden["event_names"][k]:
+            difference = "%s at T+%.3f s, golden run %s at T+%.3f s" % \
+                         (run["event_names"][k], run["event_times"][k], golden["event_names"][k], golden["event_times"][k])
+        elif abs(run["event_times"][k] - golden["event_times"][k]) > EVENT_TIME_TOLERANCE:
+            difference = "%s at T+%.3f s, golden run T+%.3f s" % \
+                         (run["event_names"][k], run["event_times"][k], golden["event_times"][k])
+        else:
+            continue
+        report.events.append({"index": k, "difference": difference})
+
+    for k in range(max(len(run["burn_delta_v"]), len(golden["burn_delta_v"]))):
+        if k >= len(run["burn_delta_v"]):
+            difference = "missing %s of %.3f m/s at T+%.3f s" % \
+                         (golden["burn_names"][k], golden["burn_delta_v"][k], golden["burn_start_times"][k])
+        elif k >= len(golden["burn_delta_v"]):
+            difference = "extra %s of %.3f m/s at T+%.3f s" % \
+                         (run["burn_names"][k], run["burn_delta_v"][k], run["burn_start_times"][k])
+        elif run["burn_names"][k] != golden["burn_names"][k]:
+            difference = "%s at T+%.3f s, golden run %s at T+%.3f s" % \
+                         (run["burn_names"][k], run["burn_start_times"][k], golden["burn_names"][k], golden["burn_start_times"][k])
+        elif abs(run["burn_start_times"][k] - golden["burn_start_times"][k]) > EVENT_TIME_TOLERANCE or \
+             abs(run["burn_end_times"][k] - golden["burn_end_times"][k]) > EVENT_TIME_TOLERANCE:
+            difference = "%s T+%.3f s to T+%.3f s, golden run T+%.3f s to T+%.3f s" % \
+                         (run["burn_names"][k], run["burn_start_times"][k], run["burn_end_times"][k],
+                          golden["burn_start_times"][k], golden["burn_end_times"][k])
+        elif abs(run["burn_delta_v"][k] - golden["burn_delta_v"][k]) > BURN_DELTA_V_TOLERANCE:
+            difference = "%s of %.3f m/s, golden run %.3f m/s" % \
+                         (run["burn_names"][k], run["burn_delta_v"][k], golden["burn_delta_v"][k])
+        else:
+            continue
+        report.burns.append({"index": k, "difference": difference})
+
+    return report
+
+def run_regression(filenames=None, update=False, processes=None):
+    """
+        run_regression - Runs every reference scenario, each in a fresh worker process, and compares it against its
+                         golden run, or replaces the golden runs if update is True. Returns the report of each scenario
+                         that was compared
+    """
+    from batch import load_scenario
+
+    if filenames is None:
+        filenames = sorted(glob.glob(os.path.join(SCENARIO_DIR, "*.json")))
+    scenarios = [load_scenario(filename) for filename in filenames]
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, maxtasksperchild=1) as pool:
+        runs = pool.map(record_reference, scenarios)
+
+    if update:
+        for run in runs:
+            save_golden(run)
+        return []
+
+    return [compare_runs(run, load_golden(run["name"])) for run in runs]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the reference scenarios against their golden runs")
+    parser.add_argument("scenarios", nargs="*", help="Reference scenario files, all of scenarios/regression by default")
+    parser.add_argument("--update", action="store_true", help="Regenerate the golden runs instead of comparing")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="Number of scenarios to run at once")
+    args = parser.parse_args()
+
+    reports = run_regression(args.scenarios or None, args.update, args.processes)
+    if args.update:
+        print("Updated the golden runs in %s" % GOLDEN_DIR)
+    for report in reports:
+        print(report.report())
+
+    sys.exit(0 if all(report.passed for report in reports) else 1)
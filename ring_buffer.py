@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: ring_buffer.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Bounded memory storage of the state vectors for open-ended runs. The last few steps are held at full
+                  rate in a ring buffer, and a decimated history is kept of everything before them. The time vector is
+                  made a ring buffer by global_params.configure, so this module does not import the simulation modules
+                  until the state vectors are moved
+"""
+
+# State vectors held by the moon and by a satellite
+MOON_FIELDS = ("x", "y", "r", "omega")
+SATELLITE_FIELDS = ("x", "y", "r", "alt_earth", "m_x", "m_y", "m_r", "alt_moon", "v_x", "v_y", "v",
+                    "theta", "epsilon", "tau", "phi", "fg_earth", "fg_moon", "f_r", "a_x", "a_y", "a")
+
+class RingBuffer:
+    def __init__(self, initial, capacity=1000, decimation=100, history_capacity=10000):
+        """
+            RingBuffer - Stands in for a state vector list. Indexed by step like the list, but only the last capacity
+                         steps can be read back. The initial condition at step 0 is always kept. Every decimation-th
+                         step is also copied into the history, which halves its resolution whenever it fills up
+        """
+        self.values = [None] * capacity
+        self.values[0] = initial
+        self.initial = initial
+        self.capacity = capacity
+        self.last = 0                       # Latest step written
+        self.stride = decimation            # Steps between entries in the history
+        self.history_capacity = history_capacity
+        self.history_steps = [0]
+        self.history_values = [initial]
+
+    def __getitem__(self, i):
+        # Slices only cover steps still held, e.g. the steps in the ring buffer
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self.last + 1))]
+
+        if i == 0:
+            return self.initial
+        elif self.last - self.capacity < i <= self.last:
+            return self.values[i % self.capacity]
+        else:
+            raise IndexError("Step %d is not held in the ring buffer, which holds steps %d to %d" % \
+                             (i, max(self.last - self.capacity + 1, 0), self.last))
+
+    def __setitem__(self, i, value):
+        if i == 0:
+            self.initial = value
+        elif i > self.last + 1 or i <= self.last - self.capacity:
+            raise IndexError("Step %d can not be written to the ring buffer after step %d" % (i, self.last))
+
+        self.values[i % self.capacity] = value
+        self.last = max(self.last, i)
+
+        if i % self.stride == 0:
+            # The same step may be written more than once, keep the latest value
+            if self.history_steps[-1] == i:
+                self.history_values[-1] = value
+            else:
+                self.history_steps.append(i)
+                self.history_values.append(value)
+                if len(self.history_steps) > self.history_capacity:
+                    self.thin_history()
+
+    def thin_history(self):
+        """
+            thin_history - Drops every other entry of the history so that its memory stays bounded
+        """
+        self.stride *= 2
+        kept = [k for k, step in enumerate(self.history_steps) if step % self.stride == 0]
+        self.history_steps = [self.history_steps[k] for k in kept]
+        self.history_values = [self.history_values[k] for k in kept]
+
+    def series(self):
+        """
+            series - Returns the steps and values of the decimated history followed by every step in the ring buffer
+        """
+        first = max(self.last - self.capacity + 1, 1)
+        steps = [step for step in self.history_steps if step < first]
+        values = self.history_values[:len(steps)]
+        steps += list(range(first, self.last + 1))
+        values += [self.values[k % self.capacity] for k in range(first, self.last + 1)]
+        return steps, values
+
+def to_ring_buffers(body, fields, capacity=1000, decimation=100, history_capacity=10000):
+    """
+        to_ring_buffers - Replaces the state vector lists of a body with ring buffers holding their initial conditions
+    """
+    for field in fields:
+        setattr(body, field, RingBuffer(getattr(body, field)[0], capacity, decimation, history_capacity))
+
+def enable_ring_buffers():
+    """
+        enable_ring_buffers - Moves the state vectors of the moon and the Photon satellite into ring buffers, so that
+                              propagate_until can run for any number of steps in constant memory. The time vector must
+                              already be a ring buffer, from global_params.configure(ring_buffer=...) before the other
+                              modules were imported. Call after reset_photon, which allocates new full length lists.
+                              The output schedule is removed, as the dump lists would otherwise grow without limit
+    """
+    import global_params
+    from celestial_body import Moon
+    from satellite import Photon
+
+    if not isinstance(global_params.t, RingBuffer):
+        raise ValueError("Configure global_params with ring buffer settings before importing the simulation modules")
+    if Moon.has_ephemeris:
+        raise ValueError("A precomputed ephemeris only covers z steps and can not be used for open-ended runs")
+
+    settings = global_params.ring_buffer_settings
+    to_ring_buffers(Moon, MOON_FIELDS, **settings)
+    to_ring_buffers(Photon, SATELLITE_FIELDS, **settings)
+    Photon.output_schedule = None
+    Photon.burn_log = BurnLog(Photon, global_params.t)
+
+class BurnLog:
+    def __init__(self, satellite, t):
+        """
+            BurnLog - Burns of a satellite logged step by step during an open-ended run, in the rows of
+                      analytics.TrajectoryIndex.burns. The decimated history is too coarse to integrate the thrust
+                      over, and misses burns of a single step altogether
+        """
+        self.satellite = satellite
+        self.t = t
+        self.burns = []         # Burns that have ended
+        self.current = None     # Start and delta-v so far of the burn in progress
+
+    def record(self, i):
+        """
+            record - Adds the thrust of step i, over the time until step i+1, to the burn in progress. Call once
+                     step i+1 has been calculated
+        """
+        self.current = self.extend(self.burns, self.current, i, self.t[i+1] - self.t[i])
+
+    def extend(self, burns, burn, i, width):
+        """
+            extend - Adds step i, lasting width seconds, to a burn in progress, or ends the burn at step i if the
+                     thrust is off. Ended burns are appended to burns. Returns the burn still in progress
+        """
+        f_r = self.satellite.f_r[i]
+        if f_r != 0:
+            if burn is None:
+                burn = {"start_step": i, "start_time": self.t[i], "delta_v": 0.0}
+            burn["delta_v"] += f_r * width / self.satellite.mass
+            return burn
+        elif burn is not None:
+            burns.append(self.ended(burn, i, self.t[i]))
+        return None
+
+    def ended(self, burn, step, time):
+        return {"start_step": burn["start_step"], "end_step": int(step),
+                "start_time": float(burn["start_time"]), "end_time": float(time),
+                "duration": float(time - burn["start_time"]), "delta_v": float(burn["delta_v"])}
+
+    def table(self, last, dt):
+        """
+            table - The burns up to and including step last, which lasts dt seconds. A burn still going at step last
+                    ends one step later, the same as in analytics.build_index
+        """
+        burns = list(self.burns)
+        burn = dict(self.current) if self.current is not None else None
+        burn = self.extend(burns, burn, last, dt)
+        if burn is not None:
+            burns.append(self.ended(burn, last + 1, self.t[last] + dt))
+        return burns
+
+class RingHistory:
+    def __init__(self, satellite, t):
+        """
+            RingHistory - Plain lists of the decimated history and ring buffer contents of a satellite, which can be
+                          passed to analytics.build_index and Trajectory.from_satellite in place of the satellite.
+                          steps holds the simulation step of each entry, and burns the burns logged during the run
+        """
+        from global_params import dt
+
+        self.steps, self.t = t.series()
+        for field in SATELLITE_FIELDS:
+            setattr(self, field, getattr(satellite, field).series()[1])
+        self.mass = satellite.mass
+        self.last = len(self.steps) - 1     # Index of the latest entry
+        self.burns = satellite.burn_log.table(self.steps[-1], dt) if satellite.burn_log is not None else None
@@ -10,8 +10,10 @@ File Description: Main methods for calculating the satellites state at any time
 """
 
 from celestial_body import Earth, Moon
-from global_params import z, G, t, dt, keyframe, PHOTON_PARAMETERS
+from global_params import z, G, t, dt, PHOTON_PARAMETERS
 from mass import Mass
+from output_schedule import OutputSchedule
+from force_models import perturbation_acceleration
 import math
 
 class Satellite(Mass):
@@ -27,7 +29,8 @@ class Satellite(Mass):
                         v_y_0, 
                         theta, 
                         epsilon, 
-                        f_r):
+                        f_r,
+                        departure_time=0):
         """
             satellite_settings - Sets and creates initial parameters for use throughout the simulation
         """
@@ -39,6 +42,7 @@ class Satellite(Mass):
         self.target_altitude = target_altitude # Apoapsis
         self.target_altitude_2 = target_altitude_2 # Periapsis
         self.target_moon_altitude = target_moon_alititude # Target altitude in the moons sphere of influence
+        self.departure_time = departure_time # Earliest time the trans-lunar injection burn may be performed
         
         # Initalise state vectors with correct lengths
         self.alt_earth = [None] * z # Distance between satellite and surface of the earth
@@ -100,12 +104,16 @@ class Satellite(Mass):
         # Time of satelite deorbiting
         self.deorbit_time = 0
         
-    def calc_position(self, 
-                      i,
-                      temp_moon_x_list,
-                      temp_moon_y_list,
-                      temp_satellite_x_list,
-                      temp_satellite_y_list):
+        # Decides which steps are dumped to file
+        self.output_schedule = OutputSchedule()
+        
+        # Logs the burns of open-ended runs, see ring_buffer.BurnLog
+        self.burn_log = None
+        
+        # Perturbation forces on top of the gravity of the earth and the moon, see force_models.py
+        self.force_models = []
+        
+    def calc_position(self, i):
         """
             calc_position - Use eulers method to calculate the position at next time step
         """
@@ -129,17 +137,24 @@ class Satellite(Mass):
         # Get altitude above the moons surface
         self.alt_moon[i+1] = self.m_r[i+1] - Moon.radius
         
-        # Loop through adding values to the lists that will be dumped into a csv file
-        while i in keyframe:
-            temp_moon_x = Moon.x[i+1] / Earth.radius
-            temp_moon_y = Moon.y[i+1] / Earth.radius
-            temp_satellite_x = Photon.x[i+1] / Earth.radius
-            temp_satellite_y = Photon.y[i+1] / Earth.radius
-            temp_moon_x_list.append(temp_moon_x)
-            temp_moon_y_list.append(temp_moon_y)
-            temp_satellite_x_list.append(temp_satellite_x)
-            temp_satellite_y_list.append(temp_satellite_y)
-            break
+    def record_output(self, 
+                      i,
+                      temp_t_list,
+                      temp_moon_x_list,
+                      temp_moon_y_list,
+                      temp_satellite_x_list,
+                      temp_satellite_y_list):
+        """
+            record_output - Adds the positions at the next time step to the lists that will be dumped into a csv file,
+                            if the output schedule asks for it. Nothing is recorded without an output schedule
+        """
+        if self.output_schedule is not None and self.output_schedule.should_record(self, i):
+            self.output_schedule.record(i)
+            temp_t_list.append(t[i+1])
+            temp_moon_x_list.append(Moon.x[i+1] / Earth.radius)
+            temp_moon_y_list.append(Moon.y[i+1] / Earth.radius)
+            temp_satellite_x_list.append(self.x[i+1] / Earth.radius)
+            temp_satellite_y_list.append(self.y[i+1] / Earth.radius)
     
     def calc_velocity(self, i):
         """
@@ -161,7 +176,7 @@ class Satellite(Mass):
         self.fg_moon[i+1] = -G * Moon.mass * self.mass / self.m_r[i+1] ** 2 # Grav force formula for the moon
         
         # Check if the satellite is still able to burn
-        if t[i+1] < Photon.turn_off:
+        if t[i+1] < self.turn_off:
             self.f_r[i+1] = self.f_r[0]
         else:
             self.f_r[i+1] = 0
@@ -194,24 +209,36 @@ class Satellite(Mass):
         else:
             print("ERROR: Could not calculate phi angle for the satellites position vector wrt the moon! At time: ", t[i+1])
 
-    def calc_normal_acceleration(self, i):
+    def calc_total_acceleration(self, i):
         """
-            calc_normal_acceleration - Calculates the normal acceleration of the satelite based on the thrust direction
+            calc_total_acceleration - Sums the gravity of the earth and the moon, the thrust along tau and the force
+                                      models enabled at this step into the acceleration of the satellite
         """
-        
-        # Calc thrust angle
-        self.tau[i+1] = self.epsilon[i+1]
-        
-        # Calc acceleration x and y
         self.a_x[i+1] = (self.fg_earth[i+1] * math.cos(self.theta[i+1]) + \
                          self.fg_moon[i+1] * math.cos(self.phi[i+1]) + \
                          self.f_r[i+1] * math.cos(self.tau[i+1])) / self.mass
         self.a_y[i+1] = (self.fg_earth[i+1] * math.sin(self.theta[i+1]) + \
                          self.fg_moon[i+1] * math.sin(self.phi[i+1]) + \
                          self.f_r[i+1] * math.sin(self.tau[i+1])) / self.mass
-        
-        # Calc acceleration vector
+
+        # Perturbations such as J2 and the sun
+        if self.force_models:
+            p_x, p_y = perturbation_acceleration(self, i)
+            self.a_x[i+1] += p_x
+            self.a_y[i+1] += p_y
+
         self.a[i+1] = math.sqrt(self.a_x[i+1]**2 + self.a_y[i+1]**2)
+
+    def calc_normal_acceleration(self, i):
+        """
+            calc_normal_acceleration - Calculates the normal acceleration of the satelite based on the thrust direction
+        """
+        
+        # Calc thrust angle
+        self.tau[i+1] = self.epsilon[i+1]
+        
+        # Calc acceleration x, y and its magnitude
+        self.calc_total_acceleration(i)
     
     def calc_accel_procedure_turn(self, i):
         """
@@ -237,13 +264,7 @@ class Satellite(Mass):
             print("ERROR: Could not calculate tau angle for the satellites thrust vector in the acceleration procedure turn! At time: ", t[i+1])
 
         # Calculate the satelite acceleration
-        self.a_x[i+1] = (self.fg_earth[i+1] * math.cos(self.theta[i+1]) + \
-                         self.fg_moon[i+1] * math.cos(self.phi[i+1]) + \
-                         self.f_r[i+1] * math.cos(self.tau[i+1])) / self.mass
-        self.a_y[i+1] = (self.fg_earth[i+1] * math.sin(self.theta[i+1]) + \
-                         self.fg_moon[i+1] * math.sin(self.phi[i+1]) + \
-                         self.f_r[i+1] * math.sin(self.tau[i+1])) / self.mass
-        self.a[i+1] = math.sqrt(self.a_x[i+1]**2 + self.a_y[i+1]**2)
+        self.calc_total_acceleration(i)
         
     def calc_thrust_earth_circular(self, i):
         """
@@ -270,13 +291,7 @@ class Satellite(Mass):
         
         # Calculate the new thrust and accelerations based on previous values
         self.f_r[i+1] = self.mass * a_t
-        self.a_x[i+1] = (self.fg_earth[i+1] * math.cos(self.theta[i+1]) + \
-                         self.fg_moon[i+1] * math.cos(self.phi[i+1]) + \
-                         self.f_r[i+1] * math.cos(self.tau[i+1])) / self.mass
-        self.a_y[i+1] = (self.fg_earth[i+1] * math.sin(self.theta[i+1]) + \
-                         self.fg_moon[i+1] * math.sin(self.phi[i+1]) + \
-                         self.f_r[i+1] * math.sin(self.tau[i+1])) / self.mass
-        self.a[i+1] = math.sqrt(self.a_x[i+1]**2 + self.a_y[i+1]**2)
+        self.calc_total_acceleration(i)
         print("IN A CIRCULAR ORBIT AROUND EARTH AT T+", t[i+1], "s INTO THE FLIGHT")
         
     def calc_thrust_earth_elliptical(self, i, r_a):
@@ -311,13 +326,7 @@ class Satellite(Mass):
 
         # Calculate the new thrust and acceleration values
         self.f_r[i+1] = self.mass * a_t
-        self.a_x[i+1] = (self.fg_earth[i+1] * math.cos(self.theta[i+1]) + \
-                         self.fg_moon[i+1] * math.cos(self.phi[i+1]) + \
-                         self.f_r[i+1] * math.cos(self.tau[i+1])) / self.mass
-        self.a_y[i+1] = (self.fg_earth[i+1] * math.sin(self.theta[i+1]) + \
-                         self.fg_moon[i+1] * math.sin(self.phi[i+1]) + \
-                         self.f_r[i+1] * math.sin(self.tau[i+1])) / self.mass
-        self.a[i+1] = math.sqrt(self.a_x[i+1]**2 + self.a_y[i+1]**2)
+        self.calc_total_acceleration(i)
         print("IN AN ELLIPTICAL ORBIT AROUND EARTH AT T+", t[i+1], "s INTO THE FLIGHT")
         
     def calc_thrust_moon_circular(self, i):
@@ -354,17 +363,19 @@ class Satellite(Mass):
 
         # Calculate the new thrust force and acceleration values
         self.f_r[i+1] = self.mass * a_t
-        self.a_x[i+1] = (self.fg_earth[i+1] * math.cos(self.theta[i+1]) + \
-                         self.fg_moon[i+1] * math.cos(self.phi[i+1]) + \
-                         self.f_r[i+1] * math.cos(self.tau[i+1])) / self.mass
-        self.a_y[i+1] = (self.fg_earth[i+1] * math.sin(self.theta[i+1]) + \
-                         self.fg_moon[i+1] * math.sin(self.phi[i+1]) + \
-                         self.f_r[i+1] * math.sin(self.tau[i+1])) / self.mass
-        self.a[i+1] = math.sqrt(self.a_x[i+1]**2 + self.a_y[i+1]**2)
+        self.calc_total_acceleration(i)
     
     def calc_acceleration(self, i):
         """
-            calc_acceleration - Conditionals to determine which part of acceleration phase of the flight the satellite is in
+            calc_acceleration - Performs the maneuver due at this step, otherwise calculates the normal acceleration
+        """
+        if not self.calc_maneuver(i):
+            self.calc_normal_acceleration(i)
+
+    def calc_maneuver(self, i):
+        """
+            calc_maneuver - Conditionals to determine which part of acceleration phase of the flight the satellite is in.
+                            Returns True if a maneuver was performed
         """
         # Circularize initial orbit
         if t[i+1] > self.procedure_turn_time and \
@@ -373,6 +384,7 @@ class Satellite(Mass):
             self.thrust_earth_in_circle_called == 0 and \
             self.thrust_earth_in_ellipse_called == 0:
                 self.calc_thrust_earth_circular(i)
+                return True
         # Perform an orbit raise to a new apoapsis
         elif t[i+1] > self.procedure_turn_time and \
             self.target_altitude + 500000 > self.alt_earth[i+1] > \
@@ -381,6 +393,7 @@ class Satellite(Mass):
             self.thrust_earth_in_ellipse_called == 0 and \
             self.thrust_earth_in_circle_called == 1:
                 self.calc_thrust_earth_elliptical(i, self.target_altitude_2)
+                return True
         # Circularize again
         elif t[i+1] > self.procedure_turn_time and \
              self.target_altitude_2 + 5e5 > self.alt_earth[i+1] > \
@@ -388,14 +401,17 @@ class Satellite(Mass):
              self.thrust_earth_in_circle_called == 1 and \
              self.thrust_earth_in_ellipse_called == 1:
                  self.calc_thrust_earth_circular(i)
+                 return True
         # Perform another orbit raise
         elif t[i+1] > self.procedure_turn_time and \
              self.target_altitude_2 + 5e5 > self.alt_earth[i+1] > \
              self.target_altitude_2 - 5e5 and \
              self.x[i+1] >= 0 and self.y[i+1] < 0 and \
+             t[i+1] >= self.departure_time and \
              self.thrust_earth_in_circle_called == 2 and \
              self.thrust_earth_in_ellipse_called == 1:
                  self.calc_thrust_earth_elliptical(i, (Moon.dE - Earth.radius))
+                 return True
         # Final circularize
         elif t[i+1] > self.procedure_turn_time and \
              225 * (math.pi / 180) > self.epsilon[i] > 180 * (math.pi / 180) and \
@@ -403,12 +419,14 @@ class Satellite(Mass):
              self.thrust_earth_in_circle_called == 2 and \
              self.thrust_moon_in_circle_called == 0:
                  self.calc_thrust_earth_circular(i)
+                 return True
         # Check if in moons SOI, if so circularize orbit around moon
         elif t[i+1] > self.procedure_turn_time and \
              self.target_moon_altitude > self.alt_moon[i+1]:
                  self.calc_thrust_moon_circular(i)
+                 return True
         else:
-            self.calc_normal_acceleration(i)
+            return False
             
     def calc_deorbit(self, i):
         """
@@ -421,7 +439,41 @@ class Satellite(Mass):
         else:
             pass
 
+# Default settings of the Photon satellite
+PHOTON_SETTINGS = {
+                   "has_deorbited": False,
+                   "procedure_turn_time": 0,
+                   "procedure_turn_angle": 0,
+                   "turn_off": 30,
+                   "target_altitude": PHOTON_PARAMETERS["EARTH_ALTITUDE"],
+                   "target_altitude_2": 10e6,
+                   "target_moon_alititude": PHOTON_PARAMETERS["MOON_ALTITUDE"],
+                   "v_x_0": 0.0,
+                   "v_y_0": 0.0,
+                   "theta": 0.0,
+                   "epsilon": 0.001*(math.pi / 180),
+                   "f_r": PHOTON_PARAMETERS["THRUST"]
+                   }
+
+def create_satellite(mass, earth_altitude, **overrides):
+    """
+        create_satellite - Creates another satellite at the given altitude above the earth. Uses the settings
+                           of the Photon satellite, any of which can be overridden by keyword
+    """
+    satellite = Satellite(mass, Earth.radius + earth_altitude, 0.0)
+    settings = dict(PHOTON_SETTINGS, target_altitude=earth_altitude)
+    settings.update(overrides)
+    satellite.satellite_settings(**settings)
+    return satellite
+
+def reset_photon(**overrides):
+    """
+        reset_photon - Puts the Photon satellite back to its initial conditions so that the simulation can be run again.
+                       Any of the arguments of satellite_settings can be overridden by keyword
+    """
+    settings = dict(PHOTON_SETTINGS, **overrides)
+    Photon.satellite_settings(**settings)
+
 # Create a satellite object
 Photon = Satellite(PHOTON_PARAMETERS["MASS"], Earth.radius + PHOTON_PARAMETERS["EARTH_ALTITUDE"], 0.0)
-Photon.satellite_settings(False, 0, 0, 30, PHOTON_PARAMETERS["EARTH_ALTITUDE"], 10e6, PHOTON_PARAMETERS["MOON_ALTITUDE"], \
-                         0.0, 0.0, 0.0, 0.001*(math.pi / 180), PHOTON_PARAMETERS["THRUST"])
\ No newline at end of file
+reset_photon()
\ No newline at end of file
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+File name: trajectory.py
+Author: Matthew Carroll
+Date created: 19/10/2026
+Date last modified: 19/10/2026
+Python Version: 3.9.5
+File Description: Stores a sparse set of nodes of the satellites trajectory and answers queries of its state at
+                  any time using cubic Hermite interpolation of the position and velocity
+"""
+
+import numpy as np
+
+# Channels stored at every node
+TRAJECTORY_FIELDS = ("t", "x", "y", "v_x", "v_y")
+
+def hermite_state(s, state_0, state_1, h):
+    """
+        hermite_state - Cubic Hermite interpolation of the position and velocity s seconds after state_0, where
+                        state_1 is the state h seconds later. States are (x, y, v_x, v_y) tuples of floats or arrays
+    """
+    u = s / h
+    h00 = 2 * u**3 - 3 * u**2 + 1
+    h10 = u**3 - 2 * u**2 + u
+    h01 = -2 * u**3 + 3 * u**2
+    h11 = u**3 - u**2
+
+    # Derivatives of the basis functions with respect to time
+    d00 = (6 * u**2 - 6 * u) / h
+    d10 = 3 * u**2 - 4 * u + 1
+    d01 = (-6 * u**2 + 6 * u) / h
+    d11 = 3 * u**2 - 2 * u
+
+    x_0, y_0, v_x_0, v_y_0 = state_0
+    x_1, y_1, v_x_1, v_y_1 = state_1
+    return (h00 * x_0 + h10 * h * v_x_0 + h01 * x_1 + h11 * h * v_x_1,
+            h00 * y_0 + h10 * h * v_y_0 + h01 * y_1 + h11 * h * v_y_1,
+            d00 * x_0 + d10 * v_x_0 + d01 * x_1 + d11 * v_x_1,
+            d00 * y_0 + d10 * v_y_0 + d01 * y_1 + d11 * v_y_1)
+
+class Trajectory:
+    def __init__(self, t, x, y, v_x, v_y):
+        """
+            Trajectory - Nodes of a trajectory in increasing time order. Only the position and velocity are stored,
+                         everything else can be worked out from them
+        """
+        self.t = np.asarray(t, dtype=float)
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.v_x = np.asarray(v_x, dtype=float)
+        self.v_y = np.asarray(v_y, dtype=float)
+
+    @classmethod
+    def from_satellite(cls, satellite, t, last, stride=100, indices=None):
+        """
+            from_satellite - Picks the nodes out of the state vectors of a satellite, up to and including step last.
+                             Every stride-th step is kept along with the steps either side of any burn, since the
+                             velocity jumps there. A list of indices to keep can be given instead
+        """
+        if indices is None:
+            thrusting = np.flatnonzero(np.asarray(satellite.f_r[:last], dtype=float))
+            indices = np.union1d(np.arange(0, last + 1, stride), np.concatenate((thrusting, thrusting + 1, [last])))
+        indices = np.unique(np.asarray(indices, dtype=int))
+
+        return cls([t[k] for k in indices],
+                   [satellite.x[k] for k in indices],
+                   [satellite.y[k] for k in indices],
+                   [satellite.v_x[k] for k in indices],
+                   [satellite.v_y[k] for k in indices])
+
+    @classmethod
+    def load(cls, filename):
+        """
+            load - Reads a trajectory saved with save
+        """
+        with np.load(filename) as data:
+            return cls(*(data[field] for field in TRAJECTORY_FIELDS))
+
+    def save(self, filename):
+        """
+            save - Writes the nodes of the trajectory to a compressed numpy file
+        """
+        np.savez_compressed(filename, **{field: getattr(self, field) for field in TRAJECTORY_FIELDS})
+
+    def state_at(self, times):
+        """
+            state_at - Interpolates the x, y position and x, y velocity at the given times. Works on a single time
+                       or an array of times, which must lie between the first and last node
+        """
+        if len(self.t) < 2:
+            raise ValueError("Need at least 2 nodes to interpolate, the trajectory has %d" % len(self.t))
+
+        times = np.asarray(times, dtype=float)
+        if np.any(times < self.t[0]) or np.any(times > self.t[-1]):
+            raise ValueError("Can only interpolate between %s s and %s s" % (self.t[0], self.t[-1]))
+
+        # Index of the node at the start of the interval each time falls in
+        k = np.clip(np.searchsorted(self.t, times, side="right") - 1, 0, len(self.t) - 2)
+        h = self.t[k+1] - self.t[k]
+
+        return hermite_state(times - self.t[k],
+                             (self.x[k], self.y[k], self.v_x[k], self.v_y[k]),
+                             (self.x[k+1], self.y[k+1], self.v_x[k+1], self.v_y[k+1]),
+                             h)
+
+    def __len__(self):
+        return len(self.t)